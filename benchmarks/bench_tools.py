@@ -0,0 +1,158 @@
+'''
+Times the hot paths of `bot/tools.py` on synthetic data at several scale points.
+
+    python benchmarks/bench_tools.py                       # default scale points
+    python benchmarks/bench_tools.py --scales 200x1000 --props 300
+    python benchmarks/bench_tools.py --baseline benchmarks/results/baseline.json
+
+A scale point is `<players>x<matches>`. Results are written to `benchmarks/results/` as JSON;
+with `--baseline`, any benchmark slower than the baseline by more than `--threshold` is
+reported and the script exits with status 1, so it can gate a deploy.
+
+`benchmarks/results/baseline.json` is committed and was produced with the default scale points:
+
+    python benchmarks/bench_tools.py --output benchmarks/results/baseline.json
+
+Timings depend on the machine, so regenerate it the same way on the machine that runs the gate,
+and again after an intended speed-up, committing the new file. Other results are not tracked.
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bot.tools import Tools # noqa: E402
+from bot.aliases import AliasCache # noqa: E402
+from bot.props import Prop # noqa: E402
+from bot.prop_store import PropStore # noqa: E402
+from synthetic import make_hltv, make_props, make_odds, make_mappers, LineModel # noqa: E402
+
+RESULTS_DIR = os.path.join(ROOT, 'benchmarks', 'results')
+SORT_BY = ['Team', 'Opponent', 'Player']
+
+
+def timed(function, repeat: int):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times)
+
+
+def run_scale(players: int, matches: int, prop_count: int, repeat: int):
+    hltv = make_hltv(players=players, matches=matches)
+    pp_props, ud_props = make_props(hltv, prop_count, 'PP'), make_props(hltv, prop_count, 'UD', seed=7)
+    odds = make_odds(hltv)
+    team_mapper, player_mapper = make_mappers(hltv)
+    cache_dir = tempfile.mkdtemp(prefix='nano-bench-')
+
+    def fresh_tools():
+        # Empty alias cache so name resolution is measured cold
+        tools = Tools(
+            cs_data=hltv, model=LineModel(), team_mapper=team_mapper, player_mapper=player_mapper,
+            aliases=AliasCache(os.path.join(cache_dir, f'{time.perf_counter_ns()}.json')),
+            prop_store=PropStore(os.path.join(cache_dir, 'props')),
+        )
+        tools.history, tools.team_matcher, tools.player_matcher, tools.name_lookups
+        return tools
+
+    tools = fresh_tools()
+    pp_df = tools.pretty_dataframes(pp_props, 'PP', odds, SORT_BY)
+    ud_df = tools.pretty_dataframes(ud_props, 'UD', odds, SORT_BY)
+    pp_frame = Prop.frame(pp_props)
+    urls = [prop.player_url for prop in pp_props if prop.player_url][:100]
+
+    def previous_game_stats():
+        for url in urls:
+            tools.previous_game_stats(url, 'MAPS 1-2 Kills')
+
+    values = tools.previous_game_stats(urls[0], 'MAPS 1-2 Kills')[0] if urls else None
+
+    def get_data():
+        # Memoized per data version, dropped so every repeat times the pivot itself
+        tools.__dict__.pop('_map_data', None)
+        return tools._get_data()
+
+    benchmarks = {
+        'build_indexes': fresh_tools,
+        'map_all_data_cold': lambda: fresh_tools().map_all_data(make_props(hltv, prop_count, 'PP'), 'PP', odds),
+        'map_all_data_warm': lambda: tools.map_all_data(make_props(hltv, prop_count, 'PP'), 'PP', odds),
+        'previous_game_stats_x100': previous_game_stats,
+        'probability_x1000': lambda: [tools.probability(values, 20.5) for _ in range(1000)],
+        'pretty_dataframes_cold': lambda: fresh_tools().pretty_dataframes(make_props(hltv, prop_count, 'PP'), 'PP', odds, SORT_BY),
+        'pretty_dataframes_unchanged': lambda: tools.pretty_dataframes(make_props(hltv, prop_count, 'PP'), 'PP', odds, SORT_BY),
+        'predict_props': lambda: tools.predict_props(pp_frame),
+        'match_props_dataframe': lambda: tools.match_props_dataframe(pp_df, ud_df),
+        '_get_data': get_data,
+    }
+
+    results = {}
+    devnull = open(os.devnull, 'w')
+    for name, function in benchmarks.items():
+        stdout, sys.stdout = sys.stdout, devnull # the pipeline prints progress lines
+        try:
+            results[name] = round(timed(function, repeat), 6)
+        finally:
+            sys.stdout = stdout
+        print(f'  {name:<26} {results[name] * 1000:>10.2f} ms')
+    devnull.close()
+    return {'rows': len(hltv), 'results': results}
+
+
+def compare(current: dict, baseline: dict, threshold: float):
+    regressions = []
+    for scale, data in current['scales'].items():
+        for name, seconds in data['results'].items():
+            before = baseline.get('scales', {}).get(scale, {}).get('results', {}).get(name)
+            if before and seconds > before * threshold:
+                regressions.append(f'{scale} {name}: {before * 1000:.2f} ms -> {seconds * 1000:.2f} ms')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scales', nargs='+', default=['100x500', '500x2000', '1000x8000'])
+    parser.add_argument('--props', type=int, default=300)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', help='Results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Allowed slowdown ratio against the baseline')
+    parser.add_argument('--output', help='Where to write results (default: benchmarks/results/tools-<timestamp>.json)')
+    args = parser.parse_args()
+
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': sys.version.split()[0],
+        'props': args.props,
+        'scales': {},
+    }
+    for scale in args.scales:
+        players, matches = (int(part) for part in scale.split('x'))
+        print(f'{players} players x {matches} matches')
+        record['scales'][scale] = run_scale(players, matches, args.props, args.repeat)
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = args.output or os.path.join(RESULTS_DIR, f"tools-{record['timestamp'][:19].replace(':', '')}.json")
+    with open(output, 'w') as f:
+        json.dump(record, f, indent=2)
+    print(f'Results written to {output}')
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(record, json.load(f), args.threshold)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+'''
+Measures import and cold-start times in fresh interpreters.
+
+    python benchmarks/cold_start.py [--repeat 5]
+
+Each measurement runs in a new process from `src/` (as the Lambda does), so module caches
+are cold. Results are appended to `benchmarks/results/cold_start.jsonl`.
+'''
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+RESULTS = os.path.join(ROOT, 'benchmarks', 'results', 'cold_start.jsonl')
+
+# Credentials are only read when a client is built, placeholders are enough to import
+ENV = {
+    'DB_HOST': 'localhost', 'DB_PORT': '3306', 'DB_USER': 'bench', 'DB_PASSWORD': 'bench',
+    'DB_NAME': 'bench', 'GSHEET_URL': 'https://example.invalid', 'HTTP_CACHE': 'off',
+}
+
+SCENARIOS = {
+    'import bot': 'import bot',
+    'import bot.tools': 'import bot.tools',
+    'import lambda_handler': 'import lambda_handler',
+    'Tools() lazy': 'from bot.tools import Tools; Tools()',
+}
+
+
+def measure(statement: str):
+    code = f'import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)'
+    output = subprocess.run(
+        [sys.executable, '-c', code],
+        cwd=SRC, env={**os.environ, **ENV}, capture_output=True, text=True, check=True
+    )
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def top_imports(statement: str, limit: int = 10):
+    # `-X importtime` reports cumulative microseconds per module on stderr
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', statement],
+        cwd=SRC, env={**os.environ, **ENV}, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in output.stderr.splitlines():
+        parts = [part.strip() for part in line.replace('import time:', '').split('|')]
+        if len(parts) == 3 and parts[1].isdigit():
+            rows.append((parts[2], int(parts[1]) / 1e6))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    record = {'timestamp': datetime.now(timezone.utc).isoformat(), 'python': sys.version.split()[0], 'seconds': {}}
+    for name, statement in SCENARIOS.items():
+        times = [measure(statement) for _ in range(args.repeat)]
+        record['seconds'][name] = round(statistics.median(times), 4)
+        print(f'{name:<24} {record["seconds"][name]:.4f}s (median of {args.repeat})')
+
+    record['top_imports'] = top_imports('import lambda_handler')
+    print('\nSlowest imports (cumulative):')
+    for module, seconds in record['top_imports']:
+        print(f'  {module:<40} {seconds:.4f}s')
+
+    os.makedirs(os.path.dirname(RESULTS), exist_ok=True)
+    with open(RESULTS, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+'''
+Synthetic `hltv_cs` history and sportsbook boards for benchmarks.
+
+Nothing here touches MySQL, the network or `model.joblib`.
+'''
+import numpy as np
+import pandas as pd
+from bot.props import Prop, Odds
+
+STAT_TYPES = ['MAPS 1-2 Kills', 'MAPS 1-2 Headshots', 'MAPS 1-3 Kills', 'MAPS 3 Kills']
+MAP_POOL = ['Mirage', 'Inferno', 'Nuke', 'Ancient', 'Anubis', 'Vertigo', 'Dust2']
+
+
+def team_name(i: int):
+    return f'Squad {i:04d}'
+
+
+def player_name(i: int):
+    return f'gamer{i:05d}x'
+
+
+def make_hltv(players: int = 500, matches: int = 2_000, max_maps: int = 3, seed: int = 0):
+    '''
+    Builds a frame shaped like `hltv_cs`: five players per team, two teams per match and
+    one row per player per map played.
+    '''
+    rng = np.random.default_rng(seed)
+    teams = max(2, players // 5)
+
+    team_pairs = np.array([rng.choice(teams, 2, replace=False) for _ in range(matches)])
+    maps_played = rng.integers(1, max_maps + 1, size=matches)
+    dates = pd.Timestamp('2022-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 1_000, size=matches)), unit='D')
+
+    # One entry per (match, map, side, player slot)
+    match_idx = np.repeat(np.arange(matches), maps_played * 10)
+    map_number = np.concatenate([np.repeat(np.arange(1, n + 1), 10) for n in maps_played])
+    side = np.tile(np.repeat([0, 1], 5), maps_played.sum())
+    slot = np.tile(np.arange(5), 2 * maps_played.sum())
+
+    team = team_pairs[match_idx, side]
+    opponent = team_pairs[match_idx, 1 - side]
+    player = team * 5 + slot
+    n = len(match_idx)
+
+    return pd.DataFrame({
+        'match_url': [f'https://www.hltv.org/matches/{i}/synthetic' for i in match_idx],
+        'player_url': [f'https://www.hltv.org/stats/players/{p}/{player_name(p)}' for p in player],
+        'player_name': [player_name(p) for p in player],
+        'team': [team_name(t) for t in team],
+        'team_url': [f'https://www.hltv.org/stats/teams/{t}/squad' for t in team],
+        'opponent': [team_name(t) for t in opponent],
+        'map_number': map_number,
+        'map': rng.choice(MAP_POOL, size=n),
+        'date': dates[match_idx],
+        'event': 'Synthetic Cup',
+        'kills': rng.integers(5, 30, size=n),
+        'headshots': rng.integers(0, 15, size=n),
+        'assists': rng.integers(0, 10, size=n),
+        'deaths': rng.integers(5, 30, size=n),
+        'kast': rng.uniform(40, 90, size=n).round(1),
+        'adr': rng.uniform(40, 120, size=n).round(1),
+        'rating': rng.uniform(0.4, 1.8, size=n).round(2),
+        'k_d_diff': rng.integers(-10, 10, size=n),
+        'fk_diff': rng.integers(-5, 5, size=n),
+        'team_score': 13,
+        'opponent_score': rng.integers(0, 12, size=n),
+    })
+
+
+def make_props(hltv: pd.DataFrame, count: int = 300, book: str = 'PP', seed: int = 1):
+    '''
+    Builds `Prop` records for players in `hltv`, with the naming noise the books have
+    (case changes, "Esports" suffixes) and a few players HLTV doesn't know.
+    '''
+    rng = np.random.default_rng(seed)
+    rosters = hltv.drop_duplicates('player_name')[['player_name', 'team', 'opponent']].to_numpy()
+    props = []
+
+    for i in range(count):
+        name, team, opponent = rosters[rng.integers(len(rosters))]
+        if i % 25 == 0:
+            name = f'unknown{i}'
+        if i % 3 == 0:
+            name = name.upper()
+
+        stat_type = STAT_TYPES[rng.integers(len(STAT_TYPES))]
+        if book == 'UD':
+            stat_type = stat_type.title() # Underdog's "Maps 1-2 Kills" casing
+
+        props.append(
+            Prop(
+                id=f'{book}-{i}',
+                type=stat_type,
+                player_name=name,
+                player_team=f'{team} Esports' if i % 2 else team,
+                opp=opponent,
+                line_score=float(rng.integers(5, 40)) + 0.5,
+            )
+        )
+    return props
+
+
+def make_odds(hltv: pd.DataFrame, count: int = 40, seed: int = 2):
+    rng = np.random.default_rng(seed)
+    pairs = hltv.drop_duplicates(['team', 'opponent'])[['team', 'opponent']].to_numpy()
+    picks = pairs[rng.choice(len(pairs), size=min(count, len(pairs)), replace=False)]
+    return [
+        Odds(team_1=team, team_2=opponent, odd_1=int(rng.integers(-300, -100)), odd_2=int(rng.integers(100, 300)))
+        for team, opponent in picks
+    ]
+
+
+def make_mappers(hltv: pd.DataFrame, seed: int = 3):
+    '''
+    Builds `teams_encoded`/`players_encoded`-shaped std mappers keyed by (hltv_url, map label).
+    '''
+    rng = np.random.default_rng(seed)
+    labels = ['MAPS 1', 'MAPS 3', 'MAPS 1-2', 'MAPS 1-3']
+
+    def mapper(urls):
+        return {(url, label): float(rng.uniform(1, 10)) for url in urls for label in labels}
+
+    return mapper(hltv['team_url'].unique()), mapper(hltv['player_url'].unique())
+
+
+class LineModel:
+    '''
+    Stand-in for `model.joblib`: picks the over when the weighted kills beat the line.
+    '''
+    feature_names_in_ = np.array(['line_score', 'player_std', 'team_std', 'opp_std', 'kills_weighted'])
+
+    def predict(self, features: pd.DataFrame):
+        return np.where(features['kills_weighted'] > features['line_score'], 'O', 'U')
+
+    def predict_proba(self, features: pd.DataFrame):
+        over = 1 / (1 + np.exp(features['line_score'] - features['kills_weighted']))
+        return np.column_stack([1 - over, over])
@@ -1,3 +1,21 @@
-from .prizepicks import PrizePicks
+from importlib import import_module
 
-prizepicks = PrizePicks()
\ No newline at end of file
+# Shared source instances, built on first access (`from bot import pp`) so importing
+# the package stays cheap on a Lambda cold start. None is named after a submodule, since
+# importing that submodule would set the package attribute to the module instead.
+_instances = {
+    'pp': ('.prizepicks', 'PrizePicks'),
+    'ud': ('.underdog', 'UnderDog'),
+    'bv': ('.bovado', 'Bovado'),
+    'gs': ('.googlesheet', 'GoogleSheet'),
+}
+
+
+def __getattr__(name: str):
+    if name not in _instances:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module_name, class_name = _instances[name]
+    instance = getattr(import_module(module_name, __name__), class_name)()
+    globals()[name] = instance
+    return instance
@@ -0,0 +1,80 @@
+import os
+import json
+from .utils.bot_utils import CACHE_DIR
+
+
+class AliasCache:
+    def __init__(self, file_path: str = os.path.join(CACHE_DIR, 'aliases.json')):
+        '''
+        Persistent cache of resolved sportsbook names.
+
+        Entries are keyed by book, kind ('player' or 'team'), raw name and team, and hold the
+        HLTV url, team url and the fuzzy score of the original match.
+        '''
+        self.file_path = file_path
+        self.entries: dict = {}
+        self.hits = 0
+        self.misses = 0
+        self.changed = False
+
+        if os.path.exists(file_path):
+            try:
+                with open(file_path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def key(book: str, kind: str, name: str, team: str = None):
+        return '|'.join([str(book), kind, str(name).strip().lower(), str(team or '').strip().lower()])
+
+    def peek(self, book: str, kind: str, name: str, team: str = None):
+        '''
+        Same as `get` without counting a hit or miss.
+        '''
+        return self.entries.get(self.key(book, kind, name, team))
+
+    def contains(self, book: str, kind: str, name: str, team: str = None):
+        return self.peek(book, kind, name, team) is not None
+
+    def get(self, book: str, kind: str, name: str, team: str = None):
+        entry = self.peek(book, kind, name, team)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def set(self, book: str, kind: str, raw_name: str, raw_team: str = None, **entry):
+        self.entries[self.key(book, kind, raw_name, raw_team)] = entry
+        self.changed = True
+
+    def invalidate(self, player_teams: dict, teams: set):
+        '''
+        Drops player entries whose HLTV team changed and team entries no longer in HLTV.
+        '''
+        stale = []
+        for key, entry in self.entries.items():
+            kind = key.split('|')[1]
+            if kind == 'player' and player_teams.get(entry.get('url')) != entry.get('team_url'):
+                stale.append(key)
+            elif kind == 'team' and entry.get('name') not in teams:
+                stale.append(key)
+
+        for key in stale:
+            del self.entries[key]
+        self.changed = self.changed or bool(stale)
+        return len(stale)
+
+    def save(self):
+        if not self.changed:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+            tmp_path = f'{self.file_path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.file_path)
+            self.changed = False
+        except OSError as e:
+            print(f'Alias cache not saved: {e}')
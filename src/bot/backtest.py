@@ -0,0 +1,206 @@
+'''
+Backtests the history-based scoring on past lines.
+
+    python -m bot.backtest                                  # data/predictions.csv, default grid
+    python -m bot.backtest --workers 8 --output sweep.csv
+
+Every line is replayed against the player's `hltv_cs` history as it stood before the game date
+(matches on or after that day are never seen), so the sweep measures what the sheet would have
+said at the time.
+'''
+import os
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+
+PREDICTIONS_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'predictions.csv')
+CALIBRATION_BINS = np.linspace(0, 1, 11)
+
+
+class Backtest:
+    def __init__(self, lines: pd.DataFrame, history, depth: int = None):
+        '''
+        Lines with their pre-game history laid out as one NaN padded matrix.
+
+        ## Parameters:
+            **lines**: *DataFrame* - `Game Date`, `Stat Type`, `Player URL`, `Line Score`, `Actual`
+            **history**: *HistoryIndex* - Per-match values with their dates
+            **depth**: *int* - Matches kept per line, most recent first (default: all of them)
+        '''
+        self.lines = lines.reset_index(drop=True)
+        self.line = pd.to_numeric(self.lines['Line Score'], errors='coerce').to_numpy(dtype=float)
+        self.actual = pd.to_numeric(self.lines['Actual'], errors='coerce').to_numpy(dtype=float)
+
+        game_days = pd.to_datetime(self.lines['Game Date'], errors='coerce').dt.normalize().to_numpy()
+        histories = []
+        for url, stat_type, game_day in zip(self.lines['Player URL'], self.lines['Stat Type'].astype(str), game_days):
+            parts = stat_type.split()
+            key = (url, history.label(parts[1])) if len(parts) > 2 else None
+            stat_idx = history.stat_index.get(parts[-1].lower())
+            block = history.index.get(key) if key else None
+
+            if block is None or stat_idx is None or pd.isnull(game_day):
+                histories.append(np.empty(0))
+                continue
+
+            # Only matches from before the game day, still most recent first
+            _, dates = history.matches[key]
+            histories.append(block[dates < game_day, stat_idx][:depth])
+
+        self.lengths = np.array([len(values) for values in histories])
+        self.values = np.full((len(histories), max(self.lengths.max(initial=0), 1)), np.nan)
+        for i, values in enumerate(histories):
+            self.values[i, :len(values)] = values
+
+    @classmethod
+    def from_csv(cls, history, file_path: str = PREDICTIONS_FILE, depth: int = None):
+        return cls(pd.read_csv(file_path), history, depth)
+
+    def chances(self, window: int = None, weights: np.ndarray = None):
+        '''
+        Returns the over probability of every line, NaN where there is no history.
+
+        With `weights` the last `len(weights)` matches count by weight (most recent first),
+        otherwise each of the last `window` matches (all when None) counts the same.
+        '''
+        if weights is not None:
+            weights = np.asarray(weights, dtype=float)
+            values = self.values[:, :len(weights)]
+            weights = np.broadcast_to(weights[:values.shape[1]], values.shape)
+        else:
+            values = self.values[:, :window]
+            weights = np.ones(values.shape)
+
+        present = ~np.isnan(values)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            overs = (values >= self.line[:, None]) & present
+            return (weights * overs).sum(axis=1) / (weights * present).sum(axis=1)
+
+    def evaluate(self, window: int = None, weights: np.ndarray = None, min_edge: float = 0.0, min_matches: int = 1):
+        '''
+        Hit rate and calibration of one configuration.
+
+        A line is called over (under) when its chance is above (below) 0.5 by more than
+        `min_edge` and it has at least `min_matches` prior matches. Pushes are left out.
+
+        ## Returns:
+            **result**: *dict* - `bets`, `hit_rate`, `coverage`, `brier` and the `calibration` table
+        '''
+        chance = self.chances(window, weights)
+        settled = ~np.isnan(self.actual) & (self.actual != self.line)
+        usable = settled & ~np.isnan(chance) & (self.lengths >= min_matches)
+
+        over = self.actual > self.line
+        edge = chance - 0.5
+        called = usable & (np.abs(edge) > min_edge)
+        correct = called & ((edge > 0) == over)
+
+        bets = int(called.sum())
+        p, observed = chance[usable], over[usable].astype(float)
+        bins = np.clip(np.digitize(p, CALIBRATION_BINS[1:-1]), 0, len(CALIBRATION_BINS) - 2)
+        calibration = pd.DataFrame({'bin': bins, 'predicted': p, 'observed': observed}).groupby('bin').agg(
+            predicted=('predicted', 'mean'), observed=('observed', 'mean'), lines=('observed', 'size')
+        )
+
+        return {
+            'bets': bets,
+            'hit_rate': correct.sum() / bets if bets else np.nan,
+            'coverage': bets / settled.sum() if settled.sum() else np.nan,
+            'brier': float(np.mean((p - observed) ** 2)) if len(p) else np.nan,
+            'calibration': calibration,
+        }
+
+    def recorded(self, predictions: pd.Series):
+        '''
+        Hit rate of the O/U calls stored with the lines, as a baseline for the sweep.
+        '''
+        predictions = predictions.to_numpy(dtype=object)
+        settled = ~np.isnan(self.actual) & (self.actual != self.line)
+        called = settled & np.isin(predictions, ['O', 'U'])
+        correct = called & ((predictions == 'O') == (self.actual > self.line))
+        return {'bets': int(called.sum()), 'hit_rate': correct.sum() / called.sum() if called.any() else np.nan}
+
+
+def grid(weights: np.ndarray, windows: list = (5, 10, 15, 20, 30, None), min_edges: list = (0.0, 0.05, 0.1, 0.15), min_matches: list = (1, 5, 10)):
+    '''
+    Every (scheme, window, min_edge, min_matches) combination, the weighted scheme once per edge/matches.
+    '''
+    schemes = [('window', window, None) for window in windows] + [('weighted', len(weights), tuple(weights))]
+    return [
+        {'scheme': scheme, 'window': window, 'weights': scheme_weights, 'min_edge': min_edge, 'min_matches': matches}
+        for (scheme, window, scheme_weights), min_edge, matches in itertools.product(schemes, min_edges, min_matches)
+    ]
+
+
+# Set once per worker process, so the backtest matrix is pickled per worker rather than per task
+_backtest = None
+
+
+def _init_worker(backtest: Backtest):
+    global _backtest
+    _backtest = backtest
+
+
+def _run(config: dict):
+    result = _backtest.evaluate(
+        window=None if config['weights'] else config['window'],
+        weights=config['weights'],
+        min_edge=config['min_edge'],
+        min_matches=config['min_matches'],
+    )
+    return {**{k: v for k, v in config.items() if k != 'weights'}, **{k: v for k, v in result.items() if k != 'calibration'}}
+
+
+def sweep(backtest: Backtest, configs: list, workers: int = None):
+    '''
+    Evaluates every configuration across worker processes.
+
+    ## Returns:
+        **results**: *DataFrame* - One row per configuration, best hit rate first
+    '''
+    if workers == 1:
+        _init_worker(backtest)
+        rows = [_run(config) for config in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(backtest,)) as executor:
+            rows = list(executor.map(_run, configs, chunksize=max(1, len(configs) // (4 * (workers or os.cpu_count() or 1)))))
+
+    return pd.DataFrame(rows).sort_values(by=['hit_rate', 'bets'], ascending=[False, False]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--predictions', default=PREDICTIONS_FILE, help='CSV of past lines with their Actual')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: one per CPU)')
+    parser.add_argument('--output', help='Write the sweep results to this CSV')
+    args = parser.parse_args()
+
+    from .tools import Tools
+    tools = Tools()
+    lines = pd.read_csv(args.predictions)
+    backtest = Backtest(lines, tools.history)
+    print(f'{len(lines)} lines, {int((backtest.lengths > 0).sum())} with prior history')
+
+    if 'Prediction' in lines.columns:
+        recorded = backtest.recorded(lines['Prediction'])
+        print(f"Recorded calls: {recorded['hit_rate']:.3f} hit rate over {recorded['bets']} bets")
+
+    results = sweep(backtest, grid(tools.WEIGHTS), args.workers)
+    print(results.head(20).to_string(index=False))
+
+    best = results.iloc[0]
+    weights = tools.WEIGHTS if best['scheme'] == 'weighted' else None
+    window = None if weights is not None or pd.isna(best['window']) else int(best['window'])
+    calibration = backtest.evaluate(window, weights)['calibration']
+    print(f"Calibration of the best scheme ({best['scheme']}, window {best['window']}):")
+    print(calibration.to_string())
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f'Results written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
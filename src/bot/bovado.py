@@ -1,7 +1,6 @@
-import pandas as pd
 from datetime import datetime
-from thefuzz import process
 from .utils.bot_utils import json_response
+from .props import Odds
 
 class Bovado:
     def __init__(self):
@@ -32,10 +31,10 @@ class Bovado:
 
                 # If the ID is not in the dictionary
                 if not odds_dict.get(id):
-                    odds_dict[id] = {
-                        'Matchup': matchup.split(' vs '),
-                        'Date': date_only
-                    }
+                    odds_dict[id] = Odds(
+                        matchup=matchup.split(' vs '),
+                        date=date_only
+                    )
                 
                 markets = event['displayGroups'][0]['markets']
 
@@ -43,7 +42,8 @@ class Bovado:
                     if market['description'] == 'Moneyline':
                         lines = market['outcomes']
                         
-                        for i, line in enumerate(lines, start=1):
+                        # Two-way moneyline, anything past the second outcome is ignored
+                        for i, line in enumerate(lines[:2], start=1):
 
                             team = line['description']
                             american_odd = line['price']['american']
@@ -1,38 +1,114 @@
 import os
-from mysql.connector import connect
+import hashlib
+import threading
+from contextlib import contextmanager
 import pandas as pd
 
 
 class Database(object):
-    def __init__(self, host: str = os.environ['DB_HOST'], port: str = os.environ['DB_PORT'], user: str = os.environ['DB_USER'], password: str = os.environ['DB_PASSWORD'], db_name: str = os.environ['DB_NAME']):
-        self.host = host
-        self.port = port
-        self.user = user
-        self.password = password
-        self.database = db_name
-        self.connection = self.connect_database()
-
-    def connect_database(self):
-        connection = connect(
-            host=self.host,
-            port=self.port,
-            user=self.user,
-            password=self.password,
-            database=self.database
-        )
-        return connection
+    # Pools outlive instances so a warm process reuses its connections
+    pools: dict = {}
+    pools_lock = threading.Lock()
+
+    def __init__(self, host: str = None, port: str = None, user: str = None, password: str = None, db_name: str = None, pool_size: int = 5):
+        # Read at construction so importing the module needs no credentials
+        self.host = host or os.environ['DB_HOST']
+        self.port = port or os.environ['DB_PORT']
+        self.user = user or os.environ['DB_USER']
+        self.password = password or os.environ['DB_PASSWORD']
+        self.database = db_name or os.environ['DB_NAME']
+        self.pool_size = pool_size
+        self.pool = self.connection_pool()
+
+    def connection_pool(self):
+        from mysql.connector.pooling import MySQLConnectionPool
+
+        key = (self.host, str(self.port), self.user, self.database)
+        with self.pools_lock:
+            pool = self.pools.get(key)
+
+            if pool is None:
+                pool = MySQLConnectionPool(
+                    pool_name=f"nano_{hashlib.sha1('|'.join(key).encode()).hexdigest()[:16]}",
+                    pool_size=self.pool_size,
+                    pool_reset_session=True,
+                    host=self.host,
+                    port=self.port,
+                    user=self.user,
+                    password=self.password,
+                    database=self.database
+                )
+                self.pools[key] = pool
+        return pool
+
+    @contextmanager
+    def connection(self):
+        '''
+        Checks a connection out of the pool, reconnecting it if the server dropped it, and
+        returns it to the pool on exit.
+        '''
+        connection = self.pool.get_connection()
+        try:
+            connection.ping(reconnect=True, attempts=3, delay=1)
+            yield connection
+        finally:
+            connection.close()
 
     def close_connection(self):
-        return self.connection.close()
-
-    def table(self, table_name: str):
-        cursor = self.connection.cursor()
-        cursor.execute(
-            f'''
-            SELECT *
-            FROM {table_name}
-            '''
-        )
-        data = cursor.fetchall()
-        cols = [col[0] for col in cursor.description]
-        return pd.DataFrame(data=data, columns=cols)
+        # Connections go back to the pool after every query, nothing is left open to close
+        return None
+
+    def iter_table(self, table_name: str, columns: list = None, where: str = None, params: tuple = None, dtypes: dict = None, chunk_size: int = 50_000):
+        '''
+        Streams a table as DataFrame chunks of at most `chunk_size` rows.
+
+        ## Parameters:
+            **columns**: *list*
+            Columns to select, every column when None.
+
+            **where**: *str*
+            Optional WHERE predicate, with `%s` placeholders filled from **params**.
+
+            **dtypes**: *dict*
+            Column to dtype hints applied to every chunk (e.g. `{'kast': float}` for DECIMAL columns).
+        '''
+        select = ", ".join(f"`{col}`" for col in columns) if columns else "*"
+        dtypes = dtypes or {}
+
+        # Unbuffered, rows stay on the server until each chunk is fetched
+        with self.connection() as connection:
+            cursor = connection.cursor(buffered=False)
+            try:
+                cursor.execute(
+                    f'''
+                    SELECT {select}
+                    FROM {table_name}
+                    {f"WHERE {where}" if where else ""}
+                    ''',
+                    params
+                )
+                cols = [col[0] for col in cursor.description]
+                empty = True
+
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    empty = False
+
+                    yield pd.DataFrame(
+                        {
+                            col: pd.Series(values, dtype=dtypes.get(col))
+                            for col, values in zip(cols, zip(*rows))
+                        }
+                    )
+
+                # Keep the column names when nothing matched
+                if empty:
+                    yield pd.DataFrame(columns=cols)
+            finally:
+                cursor.close()
+
+    def table(self, table_name: str, columns: list = None, where: str = None, params: tuple = None, dtypes: dict = None, chunk_size: int = 50_000):
+        chunks = list(self.iter_table(table_name, columns, where, params, dtypes, chunk_size))
+        return chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
@@ -1,21 +1,156 @@
 import os
-from gspread import service_account
+import gzip
+import json
 import pandas as pd
 import numpy as np
+from .utils.bot_utils import CACHE_DIR
+from .utils.metrics import metrics
 
 class GoogleSheet(object):
-    
-    def __init__(self, sheet_url: str = os.environ['GSHEET_URL'], file_path: str = 'google_credentials.json'):
+
+    def __init__(self, sheet_url: str = None, file_path: str = 'google_credentials.json', cache_dir: str = os.path.join(CACHE_DIR, 'sheets')):
+        from gspread import service_account
+
         service_account_login = service_account(filename=file_path)
-        self.client = service_account_login.open_by_url(sheet_url)
-    
+        self.client = service_account_login.open_by_url(sheet_url or os.environ['GSHEET_URL'])
+        self.cache_dir = cache_dir
+        self.worksheets: dict = {}
+        self.grids: dict = {}
+
+    def _load_worksheets(self):
+        # One metadata call for every worksheet instead of one per lookup
+        if not self.worksheets:
+            self.worksheets = {str(worksheet.id): worksheet for worksheet in self.client.worksheets()}
+        return self.worksheets
+
     def worksheet_instance(self, id: str = '635725027'):
-        return self.client.get_worksheet_by_id(id=id)
-    
+        worksheet = self._load_worksheets().get(str(id))
+        return worksheet if worksheet is not None else self.client.get_worksheet_by_id(id=id)
+
+    def worksheet_by_title(self, title: str, rows: int = 1000, cols: int = 26):
+        '''
+        Returns the worksheet with this title, adding it to the spreadsheet the first time.
+        '''
+        for worksheet in self._load_worksheets().values():
+            if worksheet.title == title:
+                return worksheet
+
+        worksheet = self.client.add_worksheet(title=title, rows=rows, cols=cols)
+        self.worksheets[str(worksheet.id)] = worksheet
+        return worksheet
+
     def update_worksheet(self, worksheet, df: pd.DataFrame):
-        df.fillna('', inplace=True)
-        df = df.astype(str)
-        
-        if not df.empty:
-            worksheet.clear()
-            return worksheet.update([df.columns.values.tolist()] + df.values.tolist(), value_input_option="USER_ENTERED")
\ No newline at end of file
+        # An empty frame leaves the worksheet as it is
+        return self.update_worksheets([(worksheet, None if df is None or df.empty else df)])
+
+    @staticmethod
+    def to_grid(df: pd.DataFrame):
+        df = df.fillna('').astype(str)
+        return [df.columns.values.tolist()] + df.values.tolist()
+
+    def _grid_path(self, worksheet):
+        return os.path.join(self.cache_dir, f'{self.client.id}_{worksheet.id}.json.gz')
+
+    def last_grid(self, worksheet):
+        '''
+        The grid this process (or a previous run, from disk) last wrote to a worksheet, or None.
+        '''
+        grid = self.grids.get(worksheet.id)
+        if grid is None:
+            try:
+                with gzip.open(self._grid_path(worksheet), 'rt') as f:
+                    grid = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self.grids[worksheet.id] = grid
+        return grid
+
+    def _save_grid(self, worksheet, grid: list):
+        self.grids[worksheet.id] = grid
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with gzip.open(self._grid_path(worksheet), 'wt') as f:
+                json.dump(grid, f)
+        except OSError as e:
+            print(f'Grid for worksheet {worksheet.id} not cached: {e}')
+
+    @staticmethod
+    def changed_ranges(old: list, new: list):
+        '''
+        Compares two grids and returns `(a1_range, values)` pairs covering every changed cell,
+        one span per changed row. Cells only present in the old grid are blanked.
+        '''
+        from gspread.utils import rowcol_to_a1
+
+        rows = max(len(old), len(new))
+        cols = max([len(row) for row in old + new] or [0])
+        old_cells = np.full((rows, cols), '', dtype=object)
+        new_cells = np.full((rows, cols), '', dtype=object)
+        for cells, grid in ((old_cells, old), (new_cells, new)):
+            for i, row in enumerate(grid):
+                cells[i, :len(row)] = row
+
+        ranges = []
+        changed = old_cells != new_cells
+        for i in np.flatnonzero(changed.any(axis=1)):
+            changed_cols = np.flatnonzero(changed[i])
+            start, end = changed_cols[0], changed_cols[-1]
+            a1 = f'{rowcol_to_a1(i + 1, start + 1)}:{rowcol_to_a1(i + 1, end + 1)}'
+            ranges.append((a1, new_cells[i, start:end + 1].tolist()))
+        return ranges
+
+    def update_worksheets(self, updates: list):
+        '''
+        Writes several DataFrames to their worksheets in one batched values update.
+
+        Only cells that differ from the last grid written to each worksheet are sent, and
+        worksheets without changes are skipped. Worksheets with no known previous grid are
+        cleared (one batched call) and rewritten in full.
+
+        ## Parameters:
+            **updates**: *list*
+            `(worksheet, DataFrame)` pairs. None leaves the worksheet as it is, an empty DataFrame
+            writes its header row and blanks the rows below.
+        '''
+        from gspread.utils import absolute_range_name
+
+        data, unknown, written = [], [], []
+
+        for worksheet, df in updates:
+            if df is None:
+                continue
+
+            grid = self.to_grid(df)
+            old = self.last_grid(worksheet)
+            if old is None:
+                unknown.append(absolute_range_name(worksheet.title))
+                old = []
+
+            ranges = self.changed_ranges(old, grid)
+            if not ranges:
+                continue
+
+            data.extend(
+                {'range': absolute_range_name(worksheet.title, a1), 'values': [values]}
+                for a1, values in ranges
+            )
+            written.append((worksheet, grid))
+
+        if unknown:
+            self.client.values_batch_clear(body={'ranges': unknown})
+
+        if not data:
+            print('Google Sheet unchanged, nothing to write')
+            return None
+
+        response = self.client.values_batch_update(
+            body={'valueInputOption': 'USER_ENTERED', 'data': data}
+        )
+
+        for worksheet, grid in written:
+            self._save_grid(worksheet, grid)
+
+        print(f'Updated {len(written)} worksheets ({len(data)} ranges)')
+        metrics.set('sheets.worksheets_written', len(written))
+        metrics.set('sheets.ranges_written', len(data))
+        return response
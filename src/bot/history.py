@@ -0,0 +1,206 @@
+import os
+import pickle
+import numpy as np
+import pandas as pd
+
+
+class HistoryIndex:
+    STATS = ["kills", "headshots", "assists", "deaths", "kast", "adr", "rating"]
+    MAP_LABELS = {'1': (1,), '2': (2,), '3': (3,), '1-2': (1, 2), '1-3': (1, 2, 3)}
+    LABEL_ALIASES = {'1-2-3': '1-3'}
+
+    def __init__(self, cs_data: pd.DataFrame = None):
+        '''
+        Per-player match history keyed by (player_url, map label).
+
+        Each entry is a 2D array of per-match sums (one row per match, most recent first,
+        one column per stat in `STATS`), so a lookup is a dict hit plus a column slice.
+        Alongside it are the match urls/dates of those rows and running summaries
+        (count, L10 and L15 averages per stat), all of which `update` maintains from new
+        matches only.
+        '''
+        self.stat_index = {stat: i for i, stat in enumerate(self.STATS)}
+        self.index: dict = {}
+        self.matches: dict = {}
+        self.summaries: dict = {}
+        self.version = None
+
+        if cs_data is not None:
+            self.build(cs_data)
+
+    def _frame(self, cs_data: pd.DataFrame):
+        df = cs_data[["player_url", "match_url", "date", "map_number"] + self.STATS].copy()
+        df[self.STATS] = df[self.STATS].apply(pd.to_numeric, errors='coerce')
+        df["map_number"] = pd.to_numeric(df["map_number"], errors='coerce')
+        df["date"] = pd.to_datetime(df["date"], errors='coerce')
+        return df.dropna(subset=["player_url", "match_url", "map_number"])
+
+    def _per_match(self, df: pd.DataFrame, maps: tuple):
+        df = df[df["map_number"].isin(maps)]
+        grouped = df.groupby(["player_url", "match_url"], sort=False)
+        per_match = grouped[self.STATS].sum()
+        per_match["date"] = grouped["date"].max()
+        per_match["rows"] = grouped.size()
+
+        # Combined labels only count matches where the player has every map
+        if len(maps) > 1:
+            per_match = per_match[per_match["rows"] == len(maps)]
+        return per_match.reset_index()
+
+    def _blocks(self, per_match: pd.DataFrame):
+        # Sorted by player then most recent match, sliced into one block per player
+        per_match = per_match.sort_values(by=["player_url", "date", "match_url"], ascending=[True, False, False])
+        urls = per_match["player_url"].to_numpy()
+        if not len(urls):
+            return
+
+        values = per_match[self.STATS].to_numpy(dtype=float)
+        match_urls = per_match["match_url"].to_numpy(dtype=object)
+        dates = per_match["date"].to_numpy()
+
+        starts = np.flatnonzero(np.r_[True, urls[1:] != urls[:-1]])
+        ends = np.r_[starts[1:], len(urls)]
+        for start, end in zip(starts, ends):
+            yield urls[start], (values[start:end], match_urls[start:end], dates[start:end])
+
+    def _set(self, key: tuple, values: np.ndarray, match_urls: np.ndarray, dates: np.ndarray):
+        if not len(values):
+            for store in (self.index, self.matches, self.summaries):
+                store.pop(key, None)
+            return
+
+        self.index[key] = values
+        self.matches[key] = (match_urls, dates)
+        self.summaries[key] = np.column_stack([
+            np.full(len(self.STATS), len(values)),
+            values[:10].mean(axis=0),
+            values[:15].mean(axis=0),
+        ])
+
+    def build(self, cs_data: pd.DataFrame):
+        self.index, self.matches, self.summaries = {}, {}, {}
+        df = self._frame(cs_data)
+
+        for label, maps in self.MAP_LABELS.items():
+            for player_url, block in self._blocks(self._per_match(df, maps)):
+                self._set((player_url, label), *block)
+        return self
+
+    def update(self, match_rows: pd.DataFrame):
+        '''
+        Folds new or corrected matches in, touching only the players that played them.
+
+        `match_rows` must hold every row of each affected match (all maps), since the combined
+        labels need the complete match to decide whether it counts.
+        '''
+        if match_rows is None or match_rows.empty:
+            return self
+
+        df = self._frame(match_rows)
+        affected_matches = set(df["match_url"])
+        players = df["player_url"].unique()
+        empty = (np.empty((0, len(self.STATS))), np.empty(0, dtype=object), np.empty(0, dtype="datetime64[ns]"))
+
+        for label, maps in self.MAP_LABELS.items():
+            fresh = dict(self._blocks(self._per_match(df, maps)))
+
+            for player_url in players:
+                key = (player_url, label)
+                if key in self.index:
+                    match_urls, dates = self.matches[key]
+                    keep = np.array([url not in affected_matches for url in match_urls], dtype=bool)
+                    old = (self.index[key][keep], match_urls[keep], dates[keep])
+                else:
+                    old = empty
+
+                new = fresh.get(player_url, empty)
+                values, match_urls, dates = (np.concatenate(parts) for parts in zip(old, new))
+
+                # Most recent first, ties broken by match url like `build`
+                order = np.lexsort((match_urls.astype(str), dates))[::-1]
+                self._set(key, values[order], match_urls[order], dates[order])
+        return self
+
+    def save(self, file_path: str, version: int):
+        self.version = version
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            tmp_path = f'{file_path}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((version, self.index, self.matches, self.summaries), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, file_path)
+        except OSError as e:
+            print(f'History index not saved: {e}')
+        return self
+
+    @classmethod
+    def load(cls, file_path: str):
+        history = cls()
+        try:
+            with open(file_path, 'rb') as f:
+                history.version, history.index, history.matches, history.summaries = pickle.load(f)
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+        return history
+
+    @classmethod
+    def materialized(cls, cs_data: pd.DataFrame, new_rows: pd.DataFrame, version: int, file_path: str):
+        '''
+        Returns the stored index brought up to `version`.
+
+        A store one version behind only has `new_rows`' matches folded in; anything older
+        (or missing) is rebuilt from `cs_data` once and saved.
+        '''
+        history = cls.load(file_path)
+
+        if history is not None and history.version == version:
+            return history
+
+        if history is not None and history.version == version - 1 and new_rows is not None:
+            match_rows = cs_data[cs_data["match_url"].isin(set(new_rows["match_url"]))]
+            return history.update(match_rows).save(file_path, version)
+
+        return cls(cs_data).save(file_path, version)
+
+    def label(self, map_label: str):
+        return self.LABEL_ALIASES.get(map_label, map_label)
+
+    def values(self, player_url: str, map_label: str, stat: str):
+        '''
+        Returns the per-match values of a stat, most recent match first, or None.
+        '''
+        stat_idx = self.stat_index.get(stat)
+        block = self.index.get((player_url, self.label(map_label)))
+
+        if block is None or stat_idx is None or len(block) == 0:
+            return None
+        return block[:, stat_idx]
+
+    def summary(self, player_url: str, map_label: str, stat: str):
+        '''
+        Returns `(matches, l10_avg, l15_avg)` for a stat, or None.
+        '''
+        stat_idx = self.stat_index.get(stat)
+        summary = self.summaries.get((player_url, self.label(map_label)))
+
+        if summary is None or stat_idx is None:
+            return None
+        count, l10_avg, l15_avg = summary[stat_idx]
+        return int(count), l10_avg, l15_avg
+
+    def value_on(self, player_url: str, map_label: str, stat: str, date):
+        '''
+        Returns the stat from the player's first match on `date` or the day after, or None.
+        '''
+        stat_idx = self.stat_index.get(stat)
+        key = (player_url, self.label(map_label))
+
+        if key not in self.index or stat_idx is None or pd.isnull(date):
+            return None
+
+        _, dates = self.matches[key]
+        day = pd.Timestamp(date).normalize().to_datetime64()
+        hits = np.flatnonzero((dates >= day) & (dates < day + np.timedelta64(2, 'D')))
+
+        # Dates run most recent first, so the last hit is the earliest match
+        return self.index[key][hits[-1], stat_idx] if len(hits) else None
@@ -0,0 +1,77 @@
+import numpy as np
+from thefuzz import process
+
+REMOVE_WORDS = {'esports', 'esport', 'sport', 'sports', 'team'}
+
+
+def remove_words_in_team_name(word: str):
+    team_name_split = str(word).split(' ')
+    team = " ".join([word for word in team_name_split if word.lower() not in REMOVE_WORDS])
+    return team
+
+
+class NameMatcher:
+    def __init__(self, choices, n: int = 3, shortlist: int = 25, normalize=remove_words_in_team_name):
+        '''
+        Fuzzy matcher over a fixed vocabulary (HLTV teams or players).
+
+        Names are normalized and split into character n-grams held in an inverted index. A query
+        only runs the full thefuzz scorer on the `shortlist` choices sharing the most n-grams
+        with it, instead of on the whole vocabulary.
+        '''
+        self.n = n
+        self.shortlist = shortlist
+        self.normalize = normalize
+        self.choices = [choice for choice in dict.fromkeys(choices) if choice is not None]
+        self.normalized = [self._clean(choice) for choice in self.choices]
+
+        postings: dict = {}
+        for i, name in enumerate(self.normalized):
+            for gram in set(self._grams(name)):
+                postings.setdefault(gram, []).append(i)
+        self.postings = {gram: np.array(ids) for gram, ids in postings.items()}
+
+    def _clean(self, name: str):
+        return " ".join(self.normalize(str(name)).lower().split())
+
+    def _grams(self, name: str):
+        padded = f' {name} '
+        return [padded[i:i + self.n] for i in range(max(len(padded) - self.n + 1, 1))]
+
+    def candidates(self, query: str):
+        hits = [self.postings[gram] for gram in set(self._grams(self._clean(query))) if gram in self.postings]
+
+        # Nothing in common, fall back to scoring everything
+        if not hits:
+            return range(len(self.choices))
+
+        counts = np.bincount(np.concatenate(hits), minlength=len(self.choices))
+        k = min(self.shortlist, np.count_nonzero(counts))
+        return np.argpartition(-counts, k - 1)[:k]
+
+    def extract(self, query: str, limit: int = 5, score_cutoff: int = 0):
+        '''
+        Returns up to `limit` (choice, score) tuples, best first, like `thefuzz.process.extractBests`.
+        '''
+        if query is None:
+            return []
+
+        shortlist = {int(i): self.normalized[i] for i in self.candidates(query)}
+        results = process.extractBests(self._clean(query), shortlist, score_cutoff=score_cutoff, limit=limit)
+        return [(self.choices[key], score) for _, score, key in results]
+
+    def extract_one(self, query: str, score_cutoff: int = 0):
+        results = self.extract(query, limit=1, score_cutoff=score_cutoff)
+        return results[0] if results else None
+
+    def extract_many(self, queries: list, limit: int = 1, score_cutoff: int = 0):
+        '''
+        Resolves a batch of names, scoring each distinct query once.
+
+        Returns a dictionary of query to its `extract` results (or a single tuple/None when `limit` is 1).
+        '''
+        resolved: dict = {}
+        for query in dict.fromkeys(queries):
+            results = self.extract(query, limit=limit, score_cutoff=score_cutoff)
+            resolved[query] = (results[0] if results else None) if limit == 1 else results
+        return resolved
@@ -0,0 +1,56 @@
+from .matcher import remove_words_in_team_name
+
+
+class OddsIndex:
+    def __init__(self, odds: list):
+        '''
+        Moneyline odds keyed by the normalized (team, opponent) pair, each side once.
+
+        Built once per run from `Bovado.current_odds` and shared by every book, which only
+        has to translate its own team names onto `teams` before looking props up.
+        '''
+        self.pairs: dict = {}
+
+        for odd in odds or []:
+            team_1, team_2 = odd.get('Team 1'), odd.get('Team 2')
+            if team_1 is None or team_2 is None:
+                continue
+
+            team_1, team_2 = remove_words_in_team_name(team_1), remove_words_in_team_name(team_2)
+            self.pairs.setdefault((team_1, team_2), []).append((odd.get('Date'), odd.get('Odd 1')))
+            self.pairs.setdefault((team_2, team_1), []).append((odd.get('Date'), odd.get('Odd 2')))
+
+        self.teams = list(dict.fromkeys(team for pair in self.pairs for team in pair))
+
+    def translate(self, names: dict):
+        '''
+        Re-keys the index with a book's team names.
+
+        ## Parameters:
+            **names**: *dict* - Normalized Bovado team name to the book's team name
+
+        ## Returns:
+            **pairs**: *dict* - (team, opponent) in the book's names to [(date, odd)]
+        '''
+        pairs: dict = {}
+        for (team, opponent), events in self.pairs.items():
+            team, opponent = names.get(team), names.get(opponent)
+            if team is not None and opponent is not None:
+                pairs.setdefault((team, opponent), []).extend(events)
+        return pairs
+
+    @staticmethod
+    def closest(events: list, game_date=None):
+        '''
+        Returns the odd of the event nearest to the game date, the latest listed on a tie.
+        '''
+        if game_date is None:
+            return events[-1][1]
+
+        def distance(event):
+            date = event[0]
+            return abs((date - game_date).days) if date is not None else float('inf')
+
+        distances = [distance(event) for event in events]
+        best = min(distances)
+        return [odd for (_, odd), days in zip(events, distances) if days == best][-1]
@@ -1,19 +1,57 @@
+import os
+import csv
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from .utils.bot_utils import json_response
-from .database import Database
-from thefuzz import process
+from .utils.metrics import metrics
+from .props import Prop
 from datetime import datetime
-from pandas import DataFrame
+
+# Repository checkout first, then the copy shipped next to the Lambda code
+LEAGUE_FILES = [
+    os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'all_leagues.csv'),
+    os.path.join(os.path.dirname(__file__), '..', 'data', 'all_leagues.csv'),
+]
 
 class PrizePicks():
 
     def __init__(self):
-        ...
+        self._leagues = None
+
+    def leagues(self) -> dict:
+        '''
+        League id to name, as listed in `data/all_leagues.csv`.
+        '''
+        if self._leagues is None:
+            path = os.environ.get('LEAGUES_FILE') or next((path for path in LEAGUE_FILES if os.path.exists(path)), None)
+            if path is None:
+                raise FileNotFoundError('all_leagues.csv not found, set LEAGUES_FILE')
+
+            with open(path, newline='') as f:
+                self._leagues = {row['id'].strip(): row['name'].strip() for row in csv.DictReader(f)}
+        return self._leagues
+
+    def resolve_league(self, league) -> str:
+        '''
+        Resolves a league id or name (e.g. `'124'`, `124` or `'CSGO'`) to its PrizePicks id.
+        Numeric ids are passed through even when the file doesn't list them yet (e.g. `'265'`).
+        '''
+        league = str(league).strip()
+        if league.isdigit():
+            return league
+
+        leagues = self.leagues()
+
+        exact = [id for id, name in leagues.items() if name == league]
+        matches = exact or [id for id, name in leagues.items() if name.lower() == league.lower()]
+        if len(matches) != 1:
+            raise ValueError(f'League {league!r} matches {len(matches)} leagues in all_leagues.csv')
+        return matches[0]
 
     def current_props(self, league: str = '265') -> list:
         '''
         Fetches for the current props displayed on Prizepicks on any given league.
 
-        To search other leagues, please refer to the GitHub file [here](#https://github.com/kazirshahria/nano-project/tree/master/data/leagues.csv).
+        To search other leagues, please refer to the GitHub file [here](#https://github.com/kazirshahria/nano-project/tree/master/data/all_leagues.csv).
         The file has the unique id's for leagues that Prizepicks supports on their platform.
 
         ---
@@ -24,10 +62,53 @@ class PrizePicks():
 
         ## Returns:
             **props**: *list*
-            A list of dictionaries, each containing details about a line.
+            A list of `Prop` records, each containing details about a line.
         '''
         url = f'https://partner-api.prizepicks.com/projections?league_id={league}'
-        response: dict = json_response(url)
+        return self.parse_props(json_response(url))
+
+    def current_props_many(self, leagues: list, max_workers: int = 4):
+        '''
+        Fetches several leagues at the same time and yields their props as each response arrives.
+        A league whose request or parsing fails is logged and skipped, the others keep streaming.
+
+        ---
+
+        ## Parameters:
+            **leagues**: *list*
+            League ids or names from `data/all_leagues.csv`.
+
+            **max_workers**: *int*
+            The most requests in flight at once.
+
+        ## Yields:
+            **prop**: *Prop*
+            The same records as `current_props`, with the league's `league_id` set.
+        '''
+        league_ids = list(dict.fromkeys(self.resolve_league(league) for league in leagues))
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(league_ids)))) as executor:
+            futures = {
+                executor.submit(json_response, f'https://partner-api.prizepicks.com/projections?league_id={league_id}'): league_id
+                for league_id in league_ids
+            }
+
+            for future in as_completed(futures):
+                league_id = futures[future]
+                try:
+                    props = self.parse_props(future.result())
+                except Exception as e:
+                    print(f'PrizePicks league {league_id} failed: {e}')
+                    metrics.count('PP.league_errors')
+                    continue
+
+                for prop in props:
+                    prop.league_id = league_id
+                    yield prop
+
+    def parse_props(self, response: dict) -> list:
+        if response is None:
+            return []
 
         player_mapper = {}
         players = response.get('included')
@@ -71,18 +152,19 @@ class PrizePicks():
             team_id = player_info.get('Team ID')
 
             prop_list.append(
-                {
-                    'ID': line_id,
-                    'Game Date': date.date(),
-                    'Game Time': date.time(),
-                    'Type': stat_type.replace('MAP 3', 'MAPS 3'),
-                    'Player Name': name.strip(),
-                    'Player Team': team.strip(),
-                    'Opp': opp.strip(),
-                    'Line Score': line_score,
-                    'Player ID': player_id,
-                    'Team ID': team_id,
-                }
+                Prop(
+                    id=line_id,
+                    game_date=date.date(),
+                    game_time=date.time(),
+                    start_time=date,
+                    type=stat_type.replace('MAP 3', 'MAPS 3'),
+                    player_name=name.strip(),
+                    player_team=team.strip(),
+                    opp=opp.strip(),
+                    line_score=line_score,
+                    player_id=player_id,
+                    team_id=team_id,
+                )
             )
 
         return prop_list
\ No newline at end of file
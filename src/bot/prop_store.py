@@ -0,0 +1,109 @@
+import os
+import gzip
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from .utils.bot_utils import CACHE_DIR
+
+
+class PropStore:
+    # Longest window any query reads (`line_history`), older partitions are deleted
+    RETENTION_DAYS = 30
+
+    def __init__(self, directory: str = os.path.join(CACHE_DIR, 'props')):
+        '''
+        Append-only history of every run's scored props, one gzip file per book and day.
+
+        Each `append` adds a gzip member of JSON lines to the day's file, stamped with the run
+        time in `Fetched`. Queries only open the files for the days they cover, and days past
+        `RETENTION_DAYS` are pruned when a new day's file is started.
+
+        A failed write (e.g. a full `/tmp`) is logged and skipped, the run carries on without it.
+        '''
+        self.directory = directory
+
+    def partition(self, book: str, day):
+        return os.path.join(self.directory, book, f'{day:%Y-%m-%d}.jsonl.gz')
+
+    def append(self, book: str, frame: pd.DataFrame, fetched_at: datetime = None):
+        if frame is None or frame.empty:
+            return None
+
+        fetched_at = fetched_at or datetime.now(timezone.utc)
+        frame = frame.assign(Fetched=fetched_at.isoformat(timespec='seconds'))
+        file_path = self.partition(book, fetched_at.date())
+        new_day = not os.path.exists(file_path)
+
+        try:
+            os.makedirs(os.path.dirname(file_path), exist_ok=True)
+            with gzip.open(file_path, 'ab') as f:
+                f.write(frame.to_json(orient='records', lines=True, date_format='iso').encode())
+        except OSError as e:
+            print(f'{book} props not stored: {e}')
+            return None
+
+        if new_day:
+            self.prune(book, fetched_at)
+        return file_path
+
+    def prune(self, book: str, until: datetime = None):
+        '''
+        Deletes the book's partitions older than `RETENTION_DAYS` days before `until` (default now).
+
+        ## Returns:
+            **removed**: *int*
+        '''
+        oldest = self.partition(book, (until or datetime.now(timezone.utc)).date() - timedelta(days=self.RETENTION_DAYS))
+        removed = 0
+        try:
+            for entry in os.listdir(os.path.dirname(oldest)):
+                # Same-length ISO dates, so the names sort by day
+                if entry.endswith('.jsonl.gz') and entry < os.path.basename(oldest):
+                    os.remove(os.path.join(os.path.dirname(oldest), entry))
+                    removed += 1
+        except OSError as e:
+            print(f'Could not prune {book} props: {e}')
+        return removed
+
+    def partitions(self, book: str, days: int = 7, until: datetime = None):
+        until = (until or datetime.now(timezone.utc)).date()
+        days = [until - timedelta(days=i) for i in range(days, -1, -1)]
+        return [path for path in (self.partition(book, day) for day in days) if os.path.exists(path)]
+
+    def read(self, book: str, days: int = 7, until: datetime = None):
+        '''
+        Returns every row stored for the book over the last `days` days, oldest run first.
+
+        ## Parameters:
+            **book**: *str* - 'PP' or 'UD'
+            **days**: *int* - Days back from `until` (default now), today included
+
+        ## Returns:
+            **rows**: *DataFrame*
+        '''
+        frames = []
+        for path in self.partitions(book, days, until):
+            try:
+                frames.append(pd.read_json(path, lines=True, compression='gzip', dtype=False, convert_dates=False))
+            except (OSError, ValueError, EOFError) as e:
+                print(f'Skipping unreadable prop partition {path}: {e}')
+
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def line_history(self, book: str, player_url: str, days: int = RETENTION_DAYS, stat_type: str = None):
+        '''
+        Returns the lines offered for a player, one row per change of line.
+        '''
+        rows = self.read(book, days)
+        if rows.empty:
+            return rows
+
+        rows = rows[rows['URL'] == player_url]
+        if stat_type is not None:
+            rows = rows[rows['Stat Type'] == stat_type]
+
+        rows = rows.sort_values(by='Fetched', kind='stable')
+        changed = rows['Line Score'].ne(rows.groupby('ID')['Line Score'].shift())
+        return rows[changed].reset_index(drop=True)
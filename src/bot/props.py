@@ -0,0 +1,97 @@
+import pandas as pd
+
+
+class Record:
+    '''
+    Compact `__slots__` row shared by the sources and `Tools`.
+
+    Fields are plain attributes, but a record can also be read and written with the display
+    keys the rest of the pipeline uses (`prop['Line Score']`, `prop.get('Odd')`), so code written
+    against dicts keeps working without a dict per row.
+    '''
+    FIELDS: dict = {}
+    __slots__ = ()
+
+    def __init__(self, **values):
+        for attr in self.__slots__:
+            setattr(self, attr, values.pop(attr, None))
+        if values:
+            raise TypeError(f'{type(self).__name__} has no fields {sorted(values)}')
+
+    def __getitem__(self, key: str):
+        return getattr(self, self.FIELDS[key])
+
+    def __setitem__(self, key: str, value):
+        setattr(self, self.FIELDS[key], value)
+
+    def get(self, key: str, default=None):
+        attr = self.FIELDS.get(key)
+        value = getattr(self, attr) if attr else None
+        return default if value is None else value
+
+    def update(self, values: dict):
+        for key, value in values.items():
+            self[key] = value
+
+    def keys(self):
+        return self.FIELDS.keys()
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    def __repr__(self):
+        values = ', '.join(f'{a}={getattr(self, a)!r}' for a in self.__slots__ if getattr(self, a) is not None)
+        return f'{type(self).__name__}({values})'
+
+    @classmethod
+    def frame(cls, records: list):
+        '''
+        Builds a DataFrame column by column, keyed by the display names.
+        Plain dicts are accepted too and go through `pd.DataFrame`.
+        '''
+        records = list(records or [])
+        if not records or not isinstance(records[0], Record):
+            return pd.DataFrame(records)
+
+        return pd.DataFrame({key: [getattr(record, attr) for record in records] for key, attr in cls.FIELDS.items()})
+
+
+class Prop(Record):
+    FIELDS = {
+        'ID': 'id',
+        'League ID': 'league_id',
+        'Game Date': 'game_date',
+        'Game Time': 'game_time',
+        'Start Time': 'start_time',
+        'Type': 'type',
+        'Player Name': 'player_name',
+        'Player Team': 'player_team',
+        'Opp': 'opp',
+        'Matchup': 'matchup',
+        'Line Score': 'line_score',
+        'Over Odd': 'over_odd',
+        'Under Odd': 'under_odd',
+        'Player ID': 'player_id',
+        'Team ID': 'team_id',
+        'Opp ID': 'opp_id',
+        'Home Team ID': 'home_team_id',
+        'Away Team ID': 'away_team_id',
+        # Filled in by Tools.map_all_data
+        'Player URL': 'player_url',
+        'Team URL': 'team_url',
+        'Opp URL': 'opp_url',
+        'Odd': 'odd',
+    }
+    __slots__ = tuple(FIELDS.values())
+
+
+class Odds(Record):
+    FIELDS = {
+        'Matchup': 'matchup',
+        'Date': 'date',
+        'Team 1': 'team_1',
+        'Odd 1': 'odd_1',
+        'Team 2': 'team_2',
+        'Odd 2': 'odd_2',
+    }
+    __slots__ = tuple(FIELDS.values())
@@ -0,0 +1,226 @@
+import os
+import json
+import shutil
+import datetime
+import decimal
+import numpy as np
+import pandas as pd
+from .utils.bot_utils import CACHE_DIR
+
+
+class TableSnapshot:
+    # Appended segments are merged back into one past this many
+    MAX_SEGMENTS = 16
+
+    def __init__(self, db, table_name: str = 'hltv_cs', watermark: str = 'date', keys: list = None, directory: str = None, dtypes: dict = None):
+        '''
+        Local columnar copy of a database table, kept current by watermark deltas.
+
+        The copy is a list of segments, each a directory with one `.npy` file per column. Strings
+        are dictionary encoded (int32 codes, -1 for null, plus the segment's vocabulary), so a
+        row costs a few bytes per column. `sync` only asks the database for rows at or after the
+        stored watermark and writes the new ones as another segment, merged back into one after
+        `MAX_SEGMENTS`. Numeric columns of a single segment load memory-mapped (copy-on-write).
+
+        A failed write (e.g. a full `/tmp`) leaves the stored copy as it was and `saved` False,
+        and the data is used from memory for that run. The copy lives under `CACHE_DIR`, so it
+        only outlasts a Lambda cold start when that is persistent storage (see `cache_dir`).
+        '''
+        self.db = db
+        self.table_name = table_name
+        self.watermark = watermark
+        self.keys = keys or ['match_url', 'player_url', 'map_number']
+        self.dtypes = dtypes
+        self.directory = directory or os.path.join(CACHE_DIR, table_name)
+        self.meta_path = os.path.join(self.directory, 'meta.json')
+        self.meta = self._read_meta()
+        self.saved = True
+
+    def _read_meta(self):
+        try:
+            with open(self.meta_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    @property
+    def version(self):
+        return self.meta['version'] if self.meta else 0
+
+    @staticmethod
+    def _column_kind(series: pd.Series):
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_datetime64_any_dtype(series):
+            return 'native'
+
+        sample = series.dropna()
+        sample = sample.iloc[0] if len(sample) else ''
+        if isinstance(sample, (decimal.Decimal, int, float)):
+            return 'float'
+        if isinstance(sample, (datetime.date, datetime.datetime)):
+            return 'datetime'
+        return 'string'
+
+    def _load_segment(self, segment: dict, kinds: dict):
+        path = os.path.join(self.directory, segment['name'])
+        mmap_mode = 'c' if segment['rows'] else None
+        columns = {}
+
+        for col, kind in kinds.items():
+            values = np.load(os.path.join(path, f'{col}.npy'), mmap_mode=mmap_mode)
+
+            if kind == 'string':
+                # Rows share the vocabulary's str objects, code -1 picks the trailing None
+                vocab = np.load(os.path.join(path, f'{col}.vocab.npy')).astype(object)
+                values = np.append(vocab, None)[values]
+            columns[col] = values
+        return columns
+
+    def load(self):
+        if self.meta is None or 'segments' not in self.meta:
+            return None
+
+        kinds = self.meta['columns']
+        try:
+            segments = [self._load_segment(segment, kinds) for segment in self.meta['segments']]
+        except (OSError, ValueError) as e:
+            print(f'{self.table_name} snapshot unreadable, reloading: {e}')
+            return None
+
+        if len(segments) == 1:
+            columns = segments[0]
+        else:
+            columns = {col: np.concatenate([segment[col] for segment in segments]) for col in kinds}
+        return pd.DataFrame(columns, copy=False)
+
+    def _normalize(self, df: pd.DataFrame, kinds: dict = None):
+        kinds = kinds or {col: self._column_kind(df[col]) for col in df.columns}
+        columns = {}
+
+        for col in df.columns:
+            kind = kinds.get(col) or self._column_kind(df[col])
+            if kind == 'float':
+                columns[col] = pd.to_numeric(df[col], errors='coerce').astype(float)
+            elif kind == 'datetime':
+                columns[col] = pd.to_datetime(df[col], errors='coerce')
+            else:
+                columns[col] = df[col]
+        return pd.DataFrame(columns, index=df.index), kinds
+
+    def _write(self, df: pd.DataFrame, segments: list):
+        '''
+        Writes `df` as a new segment after `segments` and commits the meta.
+
+        ## Returns:
+            **saved**: *bool* - False when the disk refused, the stored copy is then unchanged
+        '''
+        stored = self.meta['columns'] if self.meta and list(self.meta['columns']) == list(df.columns) else None
+        df, kinds = self._normalize(df, stored)
+        version = self.version + 1
+        name = f'segment-{version:06d}'
+        path = os.path.join(self.directory, name)
+
+        watermarks = [df[self.watermark].max()] + ([pd.Timestamp(self.meta['watermark'])] if segments else [])
+        watermark = max((w for w in watermarks if not pd.isnull(w)), default=None)
+
+        try:
+            os.makedirs(path, exist_ok=True)
+            for col, kind in kinds.items():
+                values = df[col].to_numpy()
+
+                if kind == 'string':
+                    codes, vocab = pd.factorize(df[col])
+                    np.save(os.path.join(path, f'{col}.vocab.npy'), np.asarray(vocab, dtype=str))
+                    values = codes.astype(np.int32)
+
+                np.save(os.path.join(path, f'{col}.npy'), values)
+
+            meta = {
+                'columns': kinds,
+                'segments': segments + [{'name': name, 'rows': len(df)}],
+                'rows': sum(segment['rows'] for segment in segments) + len(df),
+                'watermark': None if watermark is None else pd.Timestamp(watermark).isoformat(),
+                'version': version,
+            }
+
+            # Meta last, so a half-written segment is never picked up
+            tmp_path = f'{self.meta_path}.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(meta, f)
+            os.replace(tmp_path, self.meta_path)
+        except OSError as e:
+            print(f'{self.table_name} snapshot not saved, using it from memory: {e}')
+            shutil.rmtree(path, ignore_errors=True)
+            self.saved = False
+            return False
+
+        self.meta = meta
+        self.saved = True
+        self._remove_unused()
+        return True
+
+    def _remove_unused(self):
+        # Segments left out by a rewrite, and column files of the old one-segment layout
+        keep = {segment['name'] for segment in self.meta['segments']}
+        for entry in os.listdir(self.directory):
+            path = os.path.join(self.directory, entry)
+            if entry.startswith('segment-') and entry not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+            elif entry.endswith('.npy'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def save(self, df: pd.DataFrame):
+        '''
+        Replaces the stored copy with `df`, as one segment.
+        '''
+        return self._write(df, [])
+
+    def append(self, rows: pd.DataFrame, data: pd.DataFrame):
+        '''
+        Stores `rows` as a new segment, or rewrites `data` (everything, `rows` included) as one
+        segment when there are already `MAX_SEGMENTS` or the columns changed.
+        '''
+        if len(self.meta['segments']) >= self.MAX_SEGMENTS or list(rows.columns) != list(self.meta['columns']):
+            return self.save(data)
+        return self._write(rows, self.meta['segments'])
+
+    def sync(self):
+        '''
+        Brings the snapshot up to date and returns it with the rows that were new to it.
+
+        Rows already stored are kept as they are, only unseen keys are added.
+
+        ## Returns:
+            **(data, new_rows)**: *tuple[DataFrame, DataFrame]*
+        '''
+        local = self.load()
+
+        if local is None or self.meta.get('watermark') is None:
+            data, _ = self._normalize(self.db.table(self.table_name, dtypes=self.dtypes))
+            if self.save(data):
+                data = self.load()
+            return data, data
+
+        # Rows on the watermark day are fetched again in case that day was partially loaded
+        since = pd.Timestamp(self.meta['watermark']).to_pydatetime()
+        delta = self.db.table(self.table_name, where=f'{self.watermark} >= %s', params=(since,), dtypes=self.dtypes)
+
+        if delta.empty:
+            return local, local.iloc[0:0]
+        delta, _ = self._normalize(delta, self.meta['columns'])
+
+        # Only stored rows from the watermark on can share a key with the delta
+        recent = local[pd.to_datetime(local[self.watermark], errors='coerce') >= since]
+        known = pd.MultiIndex.from_frame(recent[self.keys].astype(str))
+        is_new = ~pd.MultiIndex.from_frame(delta[self.keys].astype(str)).isin(known)
+        new_rows = delta[is_new].drop_duplicates(subset=self.keys, keep='last').reset_index(drop=True)
+
+        print(f'{self.table_name}: {len(new_rows)} new rows since {since.date()}')
+        if new_rows.empty:
+            return local, new_rows
+
+        data = pd.concat([local, new_rows], ignore_index=True)
+        self.append(new_rows, data)
+        return data, new_rows
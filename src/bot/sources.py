@@ -0,0 +1,18 @@
+from .utils.bot_utils import fetch_concurrently
+
+
+def fetch_all_sources(pp, ud, bv):
+    '''
+    Fetches PrizePicks props, Underdog props and Bovado odds at the same time.
+
+    ## Returns:
+        **sources**: *dict*
+        `{'PP': [...], 'UD': [...], 'Bovado': [...]}`
+    '''
+    return fetch_concurrently(
+        {
+            'PP': pp.current_props,
+            'UD': ud.current_props,
+            'Bovado': lambda: list(bv.current_odds()),
+        }
+    )
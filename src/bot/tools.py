@@ -1,31 +1,232 @@
-import joblib
+import os
 import warnings
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from functools import cached_property
 import numpy as np
 import pandas as pd
 from thefuzz import process
 from .database import Database
+from .snapshot import TableSnapshot
+from .history import HistoryIndex
+from .aliases import AliasCache
+from .matcher import NameMatcher, remove_words_in_team_name
+from .odds import OddsIndex
+from .prop_store import PropStore
+from .props import Prop
+from .utils.bot_utils import fetch_concurrently
+from .utils.metrics import metrics
 
 class Tools:
     warnings.filterwarnings('ignore')
-
-    def __init__(self):
-        self.model = joblib.load('./model.joblib')
+    HLTV_DTYPES = {'kast': float, 'adr': float, 'rating': float, 'date': 'datetime64[ns]'}
+    MODEL_PATH = os.getenv('MODEL_PATH', './model.joblib')
+    PREDICTION_COLS = ['Model', 'Model %']
+
+    # Loaded models per path, kept for the life of the process so warm invocations share them
+    models: dict = {}
+
+    def __init__(self, **data):
+        '''
+        Every dataset (model, mappers, `cs_data`, indexes) is loaded on first use, so a run only
+        pays for what it touches. Pass any of them as keyword arguments to skip loading, e.g.
+        `Tools(cs_data=frame)` never connects to MySQL.
+        '''
         self.WEIGHTS = np.array([0.25, 0.20, 0.15, 0.125, 0.115, 0.10, 0.05, 0.01])
         self.WEIGHT_COLS = ["kills", "headshots", "assists", "deaths", "kast", "adr", "rating"]
-
-        # Load encoders
-        self.db = Database()
-        self.team_mapper = self._load_mapper("teams_encoded", ["hltv_url", "map_number"])
-        self.player_mapper = self._load_mapper("players_encoded", ["hltv_url", "map_number"])
-        self.team_hltv_df = self._load_hltv_map("team_map", "team_id")
-        self.player_hltv_df = self._load_hltv_map("player_map", "player_id")
-
-        # Load and process data
-        self.cs_data = self.db.table('hltv_cs')
-        self.db.close_connection()
+        self.new_cs_rows = None
+        self.scored: dict = {}
+        self.boards: dict = {}
+        self.movements: dict = {}
+        self.__dict__.update(data)
+
+    def preload(self, *names):
+        '''
+        Loads several lazy attributes at once, each table on its own pooled connection.
+        '''
+        missing = [name for name in names if name not in self.__dict__]
+        if missing:
+            self.db # Shared by the loaders, created once up front
+
+        fetch_concurrently({name: (lambda name=name: getattr(self, name)) for name in missing}, max_workers=5)
+        return self
+
+    @cached_property
+    def db(self):
+        return Database()
+
+    @cached_property
+    @metrics.timed('tools.load_model')
+    def model(self):
+        if self.MODEL_PATH not in Tools.models:
+            import joblib
+            try:
+                # Memory-mapped, so the arrays are paged in from the file rather than copied
+                Tools.models[self.MODEL_PATH] = joblib.load(self.MODEL_PATH, mmap_mode='r')
+            except FileNotFoundError:
+                print(f'No model at {self.MODEL_PATH}, skipping predictions')
+                Tools.models[self.MODEL_PATH] = None
+        return Tools.models[self.MODEL_PATH]
+
+    @cached_property
+    @metrics.timed('tools.load_mappers')
+    def team_mapper(self):
+        return self._load_mapper("teams_encoded", ["hltv_url", "map_number"])
+
+    @cached_property
+    @metrics.timed('tools.load_mappers')
+    def player_mapper(self):
+        return self._load_mapper("players_encoded", ["hltv_url", "map_number"])
+
+    @cached_property
+    @metrics.timed('tools.load_mappers')
+    def team_hltv_df(self):
+        return self._load_hltv_map("team_map", "team_id")
+
+    @cached_property
+    @metrics.timed('tools.load_mappers')
+    def player_hltv_df(self):
+        return self._load_hltv_map("player_map", "player_id")
+
+    @cached_property
+    def snapshot(self):
+        return TableSnapshot(self.db, 'hltv_cs', dtypes=self.HLTV_DTYPES)
+
+    @cached_property
+    @metrics.timed('tools.load_hltv_cs')
+    def cs_data(self):
+        # Only rows newer than the local snapshot come from MySQL
+        cs_data, self.new_cs_rows = self.snapshot.sync()
+        metrics.set('hltv_cs.rows', len(cs_data))
+        metrics.set('hltv_cs.new_rows', len(self.new_cs_rows))
+        return cs_data
+
+    @cached_property
+    @metrics.timed('tools.build_history')
+    def history(self):
+        return self._build_history(self.cs_data, self.new_cs_rows)
+
+    def _build_history(self, cs_data: pd.DataFrame, new_rows: pd.DataFrame):
+        # Injected data, or a snapshot that couldn't be written, is indexed in memory only
+        if 'snapshot' not in self.__dict__ or not self.snapshot.saved:
+            return HistoryIndex(cs_data)
+
+        # Materialized next to the snapshot; a sync with new rows only folds those matches in
+        return HistoryIndex.materialized(cs_data, new_rows, self.snapshot.version, self._history_path())
+
+    def _history_path(self):
+        return os.path.join(self.snapshot.directory, 'history.pkl')
+
+    @metrics.timed('tools.refresh')
+    def refresh(self, lock=None):
+        '''
+        Pulls new `hltv_cs` rows and swaps in the data, history and matchers built from them.
+
+        Everything is built before the swap (done under `lock` if given), so a scoring pass
+        running alongside sees either the old state or the new one.
+
+        ## Returns:
+            **new_rows**: *int*
+        '''
+        self.cs_data # Loaded before the first refresh like any other run
+        cs_data, new_rows = self.snapshot.sync()
+        if new_rows.empty:
+            return 0
+
+        history = self._build_history(cs_data, new_rows)
+        fresh = {
+            'cs_data': cs_data,
+            'new_cs_rows': new_rows,
+            'history': history,
+            'team_matcher': NameMatcher(cs_data['team'].unique()),
+            'player_matcher': NameMatcher(cs_data['player_name'].unique()),
+            'name_lookups': self._name_lookups(cs_data),
+        }
+
+        with lock or nullcontext():
+            self.__dict__.update(fresh)
+        return len(new_rows)
+
+    @cached_property
+    def prop_store(self):
+        return PropStore()
+
+    @cached_property
+    def aliases(self):
+        return AliasCache()
+
+    @cached_property
+    @metrics.timed('tools.build_matchers')
+    def team_matcher(self):
+        return NameMatcher(self.cs_data['team'].unique())
+
+    @cached_property
+    @metrics.timed('tools.build_matchers')
+    def player_matcher(self):
+        return NameMatcher(self.cs_data['player_name'].unique())
+
+    @cached_property
+    @metrics.timed('tools.build_matchers')
+    def name_lookups(self):
+        return self._name_lookups(self.cs_data)
+
+    @staticmethod
+    def _name_lookups(cs_data: pd.DataFrame):
+        '''
+        The urls `map_all_data` resolves matched names to, so no prop filters `cs_data`.
+
+        ## Returns:
+            **lookups**: *dict* - `team_players` (team -> {player_name: (player_url, team_url)}),
+            `players` (player_name -> player_url) and `teams` (team -> team_url)
+        '''
+        df = cs_data[['team', 'player_name', 'player_url', 'team_url']]
+
+        def tail_first(keys: list):
+            # Per group, the row `group.tail().iloc[0]` picks: fifth from last, or the first
+            rows = df.dropna(subset=keys)
+            groups = rows.groupby(keys, sort=False)
+            from_start, from_end = groups.cumcount(), groups.cumcount(ascending=False)
+            return rows[(from_end == 4) | ((from_start == 0) & (from_end < 4))]
+
+        team_players: dict = {}
+        picked = tail_first(['team', 'player_name'])
+        urls = dict(zip(zip(picked['team'], picked['player_name']), zip(picked['player_url'], picked['team_url'])))
+        # Players in order of first appearance, like `unique()` on the team's rows
+        pairs = df[['team', 'player_name']].dropna().drop_duplicates()
+        for team, player_name in zip(pairs['team'], pairs['player_name']):
+            team_players.setdefault(team, {})[player_name] = urls[team, player_name]
+
+        players = df.dropna(subset=['player_name']).drop_duplicates(subset='player_name')
+        teams = tail_first(['team'])
+        return {
+            'team_players': team_players,
+            'players': dict(zip(players['player_name'], players['player_url'])),
+            'teams': dict(zip(teams['team'], teams['team_url'])),
+        }
+
+    @cached_property
+    def team_std(self):
+        return self._lookup_table(self.team_mapper)
+
+    @cached_property
+    def player_std(self):
+        return self._lookup_table(self.player_mapper)
+
+    @staticmethod
+    def _lookup_table(mapper: dict):
+        # Mapper dict as a (url, map_number) index plus a value array, for vectorized lookups
+        if not mapper:
+            return pd.MultiIndex.from_arrays([[], []]), np.empty(0)
+        return pd.MultiIndex.from_tuples(list(mapper.keys())), np.fromiter(mapper.values(), dtype=float, count=len(mapper))
+
+    @staticmethod
+    def _lookup(table: tuple, urls: np.ndarray, labels: np.ndarray):
+        index, values = table
+        positions = index.get_indexer(pd.MultiIndex.from_arrays([urls, labels]))
+        return np.where(positions >= 0, values[positions] if len(values) else np.nan, np.nan)
 
     def _load_mapper(self, table_name, index_cols):
-        df = self.db.table(table_name)
+        df = self.db.table(table_name, columns=index_cols + ["std"], dtypes={"std": float})
         df.set_index(index_cols, inplace=True)
         return df.to_dict()["std"]
 
@@ -36,27 +237,45 @@ class Tools:
         df.set_index(index_col, inplace=True)
         return df
 
-    def _agg_data(self, cs_data, map_df, map_three):
-        stats = ["kills", "headshots", "assists", "deaths", "kast", "adr", "rating"]
-        avg_stats = {"kast", "adr", "rating", "k_d_diff", "fk_diff"}
-        num_maps = 3 if map_three else 2
-        map_indices = range(1, num_maps + 1)
+    def data_version(self):
+        if 'snapshot' in self.__dict__ and self.snapshot.saved:
+            return self.snapshot.version
+        return id(self.cs_data)
+
+    def latest_teams(self):
+        '''
+        Each player's most recent team url, computed once per data version.
+        '''
+        version = self.data_version()
+        cached = self.__dict__.get('_latest_teams')
+        if cached is None or cached[0] != version:
+            latest_teams = (
+                self.cs_data.sort_values(by='date')
+                .drop_duplicates(subset='player_url', keep='last')
+                .set_index('player_url')['team_url']
+                .to_dict()
+            )
+            cached = self._latest_teams = (version, latest_teams)
+        return cached[1]
 
-        for stat in stats:
-            idx = cs_data.columns.get_indexer([stat])[0]
-            total = sum(map_df[f"{stat}_map_{i}"] for i in map_indices)
-            averaged = total / num_maps if stat in avg_stats else total
-            map_df.insert(loc=idx, column=stat, value=averaged)
+    @metrics.timed('tools._get_data')
+    def _get_data(self):
+        '''
+        Returns the MAPS 1, MAPS 3, MAPS 1-2 and MAPS 1-3 rows built from `cs_data`.
 
-        drop_cols = [f"{stat}_map_{i}" for stat in stats for i in map_indices]
-        map_df.drop(columns=drop_cols, inplace=True)
+        Computed once per snapshot version (or per injected `cs_data`), so repeated calls in a
+        warm process return the same frame.
+        '''
+        version = self.data_version()
+        cached = self.__dict__.get('_map_data')
+        if cached is not None and cached[0] == version:
+            return cached[1]
 
-        map_df["map_number"] = f"MAPS 1-{num_maps}"
-        return map_df
+        stats = ["kills", "headshots", "assists", "deaths", "kast", "adr", "rating"]
+        avg_stats = ["kast", "adr", "rating"]
+        keys = ["match_url", "player_url"]
 
-    def _get_data(self):
-        cs_data = self.db.table('hltv_cs')
-        self.db.close_connection()
+        cs_data = self.cs_data.copy()
         cs_data[["kast", "adr", "rating"]] = cs_data[["kast", "adr", "rating"]].astype(float)
         cs_data["date"] = pd.to_datetime(cs_data["date"])
 
@@ -64,48 +283,88 @@ class Tools:
         cs_data = cs_data[~cs_data["map"].isin(invalid_maps)].dropna().reset_index(drop=True)
         cs_data.drop(columns=["k_d_diff", "fk_diff", "event", "date", "map", "team", "opponent", "player_name", "team_score", "opponent_score"], inplace=True)
 
-        cs_data = cs_data.groupby("match_url").filter(lambda g: set(g["map_number"]).issubset({1, 2, 3})).reset_index(drop=True)
+        # Matches with any map outside 1-3 are left out entirely
+        bad_matches = cs_data.loc[~cs_data["map_number"].isin([1, 2, 3]), "match_url"].unique()
+        cs_data = cs_data[~cs_data["match_url"].isin(bad_matches)].reset_index(drop=True)
 
         map_1 = cs_data[cs_data["map_number"] == 1]
-        map_2 = cs_data[cs_data["map_number"] == 2]
         map_3 = cs_data[cs_data["map_number"] == 3]
 
-        target_cols = ["match_url", "player_url", "kills", "headshots", "assists", "deaths", "kast", "adr", "rating"]
-        map_1_2 = pd.merge(map_1, map_2[target_cols], on=["match_url", "player_url"], suffixes=("_map_1", "_map_2"))
-
-        map_1_2_3 = map_1_2.merge(map_3[target_cols], on=["match_url", "player_url"]).rename(columns={
-            "kills": "kills_map_3", "headshots": "headshots_map_3", "assists": "assists_map_3",
-            "deaths": "deaths_map_3", "kast": "kast_map_3", "adr": "adr_map_3", "rating": "rating_map_3"
-        })
-
-        map_1_2 = self._agg_data(cs_data, map_1_2, map_three=False)
-        map_1_2_3 = self._agg_data(cs_data, map_1_2_3, map_three=True)
+        # One (match_url, player_url) x (stat, map) pivot, lined up with the map 1 rows
+        wide = cs_data.drop_duplicates(keys + ["map_number"]).set_index(keys + ["map_number"])[stats].unstack("map_number")
+        wide = wide.reindex(columns=pd.MultiIndex.from_product([stats, [1, 2, 3]]))
+        wide = wide.reindex(pd.MultiIndex.from_frame(map_1[keys]))
+        map_2_values = wide.xs(2, axis=1, level=1).to_numpy(dtype=float)
+        map_3_values = wide.xs(3, axis=1, level=1).to_numpy(dtype=float)
+
+        has_map_2 = ~np.isnan(map_2_values).any(axis=1)
+        has_map_3 = has_map_2 & ~np.isnan(map_3_values).any(axis=1)
+        total_1_2 = map_1[stats].to_numpy(dtype=float) + map_2_values
+
+        combined = []
+        for num_maps, mask, total in ((2, has_map_2, total_1_2), (3, has_map_3, total_1_2 + map_3_values)):
+            map_df = map_1[mask].copy()
+            map_df[stats] = total[mask]
+            map_df[avg_stats] = map_df[avg_stats] / num_maps
+            map_df = map_df.astype({stat: cs_data[stat].dtype for stat in stats if stat not in avg_stats})
+            map_df["map_number"] = f"MAPS 1-{num_maps}"
+            combined.append(map_df)
 
         map_1 = map_1.copy()
         map_3 = map_3.copy()
         map_1["map_number"] = "MAPS 1"
         map_3["map_number"] = "MAPS 3"
 
-        return pd.concat([map_1, map_3, map_1_2, map_1_2_3], ignore_index=True)
+        data = pd.concat([map_1, map_3, *combined], ignore_index=True)
+        self._map_data = (version, data)
+        return data
+
+    def odds_index(self, odds: list):
+        # Built once per odds list, so the PP and UD passes of a run share it
+        cached = self.__dict__.get('_odds_index')
+        if cached is None or cached[0] is not odds:
+            cached = self._odds_index = (odds, OddsIndex(odds))
+        return cached[1]
+
+    def attach_odds(self, props: list, odds: list):
+        '''
+        Sets `Odd` on every prop whose (team, opponent) has a Bovado moneyline.
+        '''
+        if not props or not odds:
+            return props
+
+        # Book team names in first-seen order, teams of named players first, then opponents
+        prop_teams = dict.fromkeys(
+            [prop['Player Team'] for prop in props if prop['Player Team'] is not None and prop['Player Name'] is not None] +
+            [prop['Opp'] for prop in props if prop['Opp'] is not None]
+        )
+
+        # Through the (team, opponent) index shared by both books
+        odds_index = self.odds_index(odds)
+        if odds_index.pairs:
+            odds_matcher = NameMatcher(list(prop_teams), normalize=str)
+            odds_teams = odds_matcher.extract_many(odds_index.teams, score_cutoff=60)
+            book_pairs = odds_index.translate({name: best[0] for name, best in odds_teams.items() if best is not None})
 
-    def map_all_data(self, props: list, sportsbook: str = 'PP', odds: list = None):
-        hltv_df = self.cs_data
+            for prop in props:
+                events = book_pairs.get((prop.get('Player Team'), prop.get('Opp')))
+                if events:
+                    prop['Odd'] = OddsIndex.closest(events, prop.get('Game Date'))
+        return props
 
+    @metrics.timed('tools.map_all_data')
+    def map_all_data(self, props: list, sportsbook: str = 'PP', odds: list = None, report: bool = True):
         if len(props) == 0:
             print(f'{sportsbook} has no props.')
             return None
-        
-        def remove_words_in_team_name(word: str):
-            team_name_split = word.split(' ')
-            remove_words = ['esports', 'esport', 'sport', 'sports', 'team']
-            team = " ".join([word for word in team_name_split if word.lower() not in remove_words])
-            return team
-
-        unique_teams = hltv_df['team'].unique()
-        all_unique_players = hltv_df['player_name'].unique()
-        prop_teams: list = []
+
+        # Matched names resolve through these, no prop scans `cs_data`
+        lookups = self.name_lookups
         teams_detected: dict = {}
-        props_matched = 0
+
+        # Drop cached names whose player moved teams since they were resolved
+        latest_teams = self.latest_teams()
+        self.aliases.invalidate(latest_teams, lookups['teams'])
         
         # Match player by finding the team first
         for prop in props:
@@ -115,62 +374,75 @@ class Tools:
             if prop_team is None or prop_player is None:
                 continue
             
-            # Later usage for odds
-            if prop_team not in prop_teams:
-                prop_teams.append(prop_team)
-
             prop_team = remove_words_in_team_name(str(prop_team))
-            teams_matched = process.extract(prop_team, unique_teams, limit=5)
+
+            # Resolved on a previous run, risky (name only) matches are applied further down.
+            # This is the prop's one counted lookup, the later passes only peek
+            cached = self.aliases.get(sportsbook, 'player', prop_player, prop_team)
+            if cached is not None:
+                if cached.get('risky'):
+                    continue
+                prop['Player URL'] = cached['url']
+                prop['Team URL'] = cached['team_url']
+                continue
+
+            teams_matched = self.team_matcher.extract(prop_team, limit=5)
             
             # Narrow down the choices by locating the team first
             for team in teams_matched:
-                df = hltv_df[hltv_df['team'] == team[0]]
-                unique_players = df['player_name'].unique()
-                players_matched = process.extractOne(prop_player, unique_players, score_cutoff=80)
+                team_players = lookups['team_players'].get(team[0], {})
+                players_matched = process.extractOne(prop_player, list(team_players), score_cutoff=80)
 
                 if players_matched is not None:
-                    player_df = df[df['player_name'] == players_matched[0]]
-                    player_values = player_df.tail().iloc[0]
-                    player_url = player_values['player_url']
-                    player_team = player_values['team_url']
+                    player_url, player_team = team_players[players_matched[0]]
 
                     # Add player team to a dictionary
                     team_not_found = teams_detected.get(prop_team)
                     if team_not_found == None:
                         teams_detected[prop_team] = team
+                        self.aliases.set(sportsbook, 'team', prop_team, name=team[0], url=player_team, score=team[1])
 
-                    props_matched += 1
-
-                    prop.update(
-                        {
-                            'Player URL': player_url,
-                            'Team URL': player_team
-                        }
+                    self.aliases.set(
+                        sportsbook, 'player', prop_player, prop_team,
+                        url=player_url, team_url=latest_teams.get(player_url), score=players_matched[1]
                     )
+
+                    prop['Player URL'] = player_url
+                    prop['Team URL'] = player_team
                     break
             
         # Find the best match using the name only
-        risky_matches = 0
         for prop in props:
             player_url_not_found, player_name = prop.get('Player URL'), prop.get('Player Name')
 
             if player_url_not_found == None:
-                best_players = process.extractBests(player_name, all_unique_players, limit=10)
+                player_team = remove_words_in_team_name(str(prop.get('Player Team')))
+                cached = self.aliases.peek(sportsbook, 'player', player_name, player_team)
+                if cached is not None and cached.get('risky'):
+                    prop['Player URL'] = cached['url']
+                    continue
+
+                best_players = self.player_matcher.extract(player_name, limit=10)
                 
                 for best_player in best_players:
-                    player_match_df = hltv_df[hltv_df['player_name'] == best_player[0]]
-                    
                     # There's a 100% name match
                     if best_player[1] == 100:
-                        prop.update(
-                            {
-                                'Player URL': player_match_df.iloc[0]['player_url']
-                            }
+                        player_url = lookups['players'][best_player[0]]
+                        prop['Player URL'] = player_url
+                        self.aliases.set(
+                            sportsbook, 'player', player_name, player_team,
+                            url=player_url, team_url=latest_teams.get(player_url), score=best_player[1], risky=True
                         )
-                        risky_matches += 1
                         break
 
-        # Opponent teams
+        # Opponent teams, unseen names are resolved in one batch
+        opponents = [remove_words_in_team_name(prop['Opp']) for prop in props if prop['Opp'] is not None]
+        unresolved = [
+            opponent for opponent in dict.fromkeys(opponents)
+            if opponent not in teams_detected and not self.aliases.contains(sportsbook, 'team', opponent)
+        ]
+        best_opponents = self.team_matcher.extract_many(unresolved, score_cutoff=65)
+
         for prop in props:
             prop_opponent = prop['Opp']
 
@@ -178,59 +450,54 @@ class Tools:
             if prop_opponent is None:
                 continue
             
-            # Later usage for odds
-            if prop_opponent not in prop_teams:
-                prop_teams.append(prop_opponent)
-
             prop_opponent = remove_words_in_team_name(prop_opponent)
+
+            cached = self.aliases.peek(sportsbook, 'team', prop_opponent)
+            if cached is not None:
+                prop['Opp URL'] = cached['url']
+                continue
+
             team_exist = teams_detected.get(prop_opponent)
             if team_exist:
                 best_opponent_team = team_exist
             else:
-                best_opponent_team = process.extractOne(prop_opponent, unique_teams, score_cutoff=65)
+                best_opponent_team = best_opponents.get(prop_opponent)
+
+            if best_opponent_team is None:
+                continue
             
-            df = hltv_df[hltv_df['team'] == best_opponent_team[0]]
-            prop.update(
-                {
-                    'Opp URL': df.tail().iloc[0]['team_url']
-                }
-            )
+            opponent_url = lookups['teams'][best_opponent_team[0]]
+            self.aliases.set(sportsbook, 'team', prop_opponent, name=best_opponent_team[0], url=opponent_url, score=best_opponent_team[1])
+            prop['Opp URL'] = opponent_url
         
-        # Bovado odds
-        for odd in odds:
-            team_1, team_2, team_1_odd, team_2_odd = odd.get('Team 1'), odd.get('Team 2'), odd.get('Odd 1'), odd.get('Odd 2')
-
-            team_1 = remove_words_in_team_name(team_1)
-            team_2 = remove_words_in_team_name(team_2)
+        self.attach_odds(props, odds)
+        if report:
+            self.report_matches(props, sportsbook)
+        self.aliases.save()
+        return props
 
-            team_1_best = process.extractOne(team_1, prop_teams, score_cutoff=60)
-            team_2_best = process.extractOne(team_2, prop_teams, score_cutoff=60)
+    def report_matches(self, props: list, sportsbook: str, reused: int = 0):
+        '''
+        Prints and records how many of the book's props are located.
 
-            if team_1_best is None or team_2_best is None:
-                continue
+        Props with a team url were matched through their team, the rest with a player url are
+        risky (name only) matches. `reused` is how many kept the urls of the previous run.
+        '''
+        located = [prop for prop in props if prop.get('Player URL') is not None]
+        props_matched = sum(prop.get('Team URL') is not None for prop in located)
+        risky_matches = len(located) - props_matched
 
-            for prop in props:
-                player_team, opp_team = prop.get('Player Team'), prop.get('Opp')
-
-                if (player_team  == team_1_best[0]) and (opp_team == team_2_best[0]):
-                    prop.update(
-                        {
-                            'Odd': team_1_odd   
-                        }
-                    )
-                    continue
-
-                if (player_team  == team_2_best[0]) and (opp_team == team_1_best[0]):
-                    prop.update(
-                        {
-                            'Odd': team_2_odd   
-                        }
-                    )
-                    continue
-        
         print(f'Located {round(props_matched/len(props), 2) * 100}% ({props_matched}/{len(props)}) of the props on {sportsbook}')
         print(f'{risky_matches} props are risky matches (inactive or change of team) on {sportsbook}')
-        return props
+        print(f'Alias cache: {self.aliases.hits} hits, {self.aliases.misses} misses')
+        metrics.set(f'{sportsbook}.props', len(props))
+        metrics.set(f'{sportsbook}.matched', props_matched)
+        metrics.set(f'{sportsbook}.risky', risky_matches)
+        metrics.set(f'{sportsbook}.reused', reused)
+        metrics.rate(f'{sportsbook}.match_rate', props_matched, len(props))
+        metrics.set('aliases.hits', self.aliases.hits)
+        metrics.set('aliases.misses', self.aliases.misses)
+        metrics.rate('aliases.hit_rate', self.aliases.hits, self.aliases.hits + self.aliases.misses)
 
     def previous_game_stats(self, player_url: str, map_type: str):
         player_values, l15_values, l15_avg, l10_avg = None, None, None, None
@@ -240,56 +507,13 @@ class Tools:
 
         stat_target = map_type.split()[-1].strip().lower()
         map_label = "".join(map_type.split()[1].strip())
-        
-        df = self.cs_data # Load the HLTV data from the database
-
-        if map_label == '1':
-            player_df = df[
-                (df['player_url'] == player_url) &
-                ((df['map_number'] == 1))
-            ]
-
-        elif map_label == '2':
-            player_df = df[
-                (df['player_url'] == player_url) &
-                ((df['map_number'] == 2))
-            ]
-
-        elif map_label == '3':
-            player_df = df[
-                (df['player_url'] == player_url) &
-                ((df['map_number'] == 3))
-            ]
-
-        elif map_label == '1-2':
-            player_df = df[
-                (df['player_url'] == player_url) &
-                ((df['map_number'] == 1) | (df['map_number'] == 2))
-            ]
-            player_df = player_df.groupby('match_url').filter(lambda col: len(col) == 2)
-
-        elif (map_label == '1-3') or (map_label == '1-2-3'):
-            player_df = df[
-                (df['player_url'] == player_url) &
-                ((df['map_number'] == 1) | (df['map_number'] == 2) | (df['map_number'] == 3))
-            ]
-            player_df = player_df.groupby('match_url').filter(lambda col: len(col) == 3)
 
-        else:
-            player_df = pd.DataFrame() # Empty dataframe
-        
-        if not player_df.empty:
-            player_values = (
-                player_df
-                .sort_values(by='date')
-                .groupby(['match_url'])[stat_target]
-                .sum()
-                .values[::-1]
-            )
+        # Per-match sums, most recent first, from the prebuilt history index
+        player_values = self.history.values(player_url, map_label, stat_target)
 
+        if player_values is not None:
             l15_values = player_values[:15]
-            l10_avg = np.mean(player_values[:10]) if len(player_values) >= 10 else np.mean(player_values)
-            l15_avg = np.mean(l15_values) if len(l15_values) > 0 else 0
+            _, l10_avg, l15_avg = self.history.summary(player_url, map_label, stat_target)
 
         return player_values, l15_values, l10_avg, l15_avg
 
@@ -310,121 +534,419 @@ class Tools:
 
         return probability, edge, p
 
-    def pretty_dataframes(self, props: list, sportsbook: str, odds: list, sort_by_list: list):
-        # Locate the Urls
-        props = self.map_all_data(props, sportsbook, odds)
-        data_list: list = []
-        
-        def fix_type_column(title_element: str):
-            title_element = str(title_element).title()
-            title_element = title_element.replace('Maps ', 'M')
-            title_element = title_element.replace('Headshots', 'Hs')
-            title_element = title_element.replace('1-2-3', '1-3')
-            return title_element
-        
-        props_not_found = 0
+    @metrics.timed('tools.score_props')
+    def score_props(self, props: pd.DataFrame, sportsbook: str):
+        n = len(props)
         df_columns = ['Player', 'Team', 'Opponent', 'Type'] + [f'M{i}' for i in range(1, 16)] +\
         [sportsbook, 'L10 Avg', 'L10 Diff', 'L15 Avg', 'L15 Diff', 'Chance', 'Edge +/-', 'O/U', 'Odd', 'URL']
 
+        if n == 0:
+            return pd.DataFrame(columns=df_columns)
+
+        def column(name: str):
+            return props[name] if name in props.columns else pd.Series([None] * n, index=props.index)
+
+        types = column('Type').astype(str)
+        urls = column('Player URL').where(column('Player URL').notna(), None).to_numpy(dtype=object)
+        lines = pd.to_numeric(column('Line Score'), errors='coerce').to_numpy(dtype=float)
+        found = np.array([url is not None for url in urls])
+
+        # One dict hit per prop, then everything else runs over the flattened histories
+        histories = []
+        for url, map_type in zip(urls, types):
+            values = None
+            if url is not None:
+                parts = map_type.split()
+                values = self.history.values(url, parts[1].strip(), parts[-1].strip().lower())
+            histories.append(values if values is not None else np.empty(0))
+
+        lengths = np.array([len(h) for h in histories])
+        flat = np.concatenate(histories) if lengths.sum() else np.empty(0)
+        owner = np.repeat(np.arange(n), lengths)
+        position = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        has_history = lengths > 0
+
+        last_15 = np.full((n, 15), np.nan)
+        recent = position < 15
+        last_15[owner[recent], position[recent]] = flat[recent]
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            l10_avg = np.bincount(owner, weights=flat * (position < 10), minlength=n) / np.minimum(lengths, 10)
+            l15_avg = np.bincount(owner, weights=flat * recent, minlength=n) / np.minimum(lengths, 15)
+            hits = np.bincount(owner, weights=flat >= lines[owner], minlength=n)
+            chance = np.where(has_history, hits / lengths, np.nan)
+
+        edge = chance - 0.50
+        over_under = np.select([edge > 0, edge < 0, edge == 0], ['O', 'U', 'N'], default=None)
+        l10_avg[~has_history] = np.nan
+        l15_avg[~has_history] = np.nan
+
+        df = pd.DataFrame({
+            'Player': column('Player Name').to_numpy(),
+            'Team': column('Player Team').to_numpy(),
+            'Opponent': column('Opp').to_numpy(),
+            'Type': (
+                types.str.title()
+                .str.replace('Maps ', 'M', regex=False)
+                .str.replace('Headshots', 'Hs', regex=False)
+                .str.replace('1-2-3', '1-3', regex=False)
+                .to_numpy()
+            ),
+        })
+        df[[f'M{i}' for i in range(1, 16)]] = last_15
+        df[sportsbook] = lines
+        df['L10 Avg'] = l10_avg
+        df['L10 Diff'] = l10_avg - lines
+        df['L15 Avg'] = l15_avg
+        df['L15 Diff'] = l15_avg - lines
+        df['Chance'] = chance
+        df['Edge +/-'] = np.where(chance == 0, 0, edge)
+        df['O/U'] = over_under
+        df['Odd'] = np.where(found, column('Odd').to_numpy(dtype=object), None)
+        df['URL'] = urls
+        return df[df_columns]
+
+    def model_features(self, props: pd.DataFrame):
+        '''
+        Builds the feature matrix for every prop in one pass.
+
+        Features are the line, the player/team/opponent `std` from the encoded mappers for the
+        prop's map label (e.g. `MAPS 1-2`) and, per stat in `WEIGHT_COLS`, the `WEIGHTS`-weighted
+        average of the player's last matches on that label.
+
+        ## Parameters:
+            **props**: *DataFrame* - Props as built by `Prop.frame`
+
+        ## Returns:
+            **features**: *DataFrame* - One row per prop, NaN where a feature is unknown
+        '''
+        n = len(props)
+
+        def column(name: str):
+            return props[name] if name in props.columns else pd.Series([None] * n, index=props.index)
+
+        labels = column('Type').astype(str).str.split().str[1].map(self.history.label)
+        map_labels = ('MAPS ' + labels).to_numpy(dtype=object)
+        player_urls = column('Player URL').to_numpy(dtype=object)
+
+        # Last len(WEIGHTS) matches per prop, all stats, NaN padded
+        depth = len(self.WEIGHTS)
+        stat_cols = [self.history.stat_index[stat] for stat in self.WEIGHT_COLS]
+        recent = np.full((n, depth, len(stat_cols)), np.nan)
+        for i, key in enumerate(zip(player_urls, labels)):
+            block = self.history.index.get(key)
+            if block is not None:
+                recent[i, :min(len(block), depth)] = block[:depth, stat_cols]
+
+        weights = self.WEIGHTS[None, :, None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weighted = np.nansum(recent * weights, axis=1) / (~np.isnan(recent) * weights).sum(axis=1)
+
+        features = pd.DataFrame({
+            'line_score': pd.to_numeric(column('Line Score'), errors='coerce').to_numpy(dtype=float),
+            'player_std': self._lookup(self.player_std, player_urls, map_labels),
+            'team_std': self._lookup(self.team_std, column('Team URL').to_numpy(dtype=object), map_labels),
+            'opp_std': self._lookup(self.team_std, column('Opp URL').to_numpy(dtype=object), map_labels),
+        })
+        features[[f'{stat}_weighted' for stat in self.WEIGHT_COLS]] = weighted
+        return features
+
+    @metrics.timed('tools.predict_props')
+    def predict_props(self, props: pd.DataFrame):
+        '''
+        Runs the model once over every prop with a complete feature row.
+
+        ## Returns:
+            **predictions**: *DataFrame* - `PREDICTION_COLS`, one row per prop, None where not predicted
+        '''
+        predictions = pd.DataFrame(None, index=range(len(props)), columns=self.PREDICTION_COLS, dtype=object)
+        if self.model is None or predictions.empty:
+            return predictions
+
+        features = self.model_features(props)
+        names = list(getattr(self.model, 'feature_names_in_', features.columns))
+        missing = [name for name in names if name not in features.columns]
+        if missing:
+            print(f'Model expects unknown features {missing}, skipping predictions')
+            return predictions
+
+        # Without feature names only the count can be checked
+        expected = getattr(self.model, 'n_features_in_', len(names))
+        if expected != len(names):
+            print(f'Model expects {expected} features, {len(names)} built, skipping predictions')
+            return predictions
+
+        features = features[names]
+        ready = features.notna().all(axis=1).to_numpy()
+        if ready.any():
+            try:
+                model_predictions = self.model.predict(features[ready])
+                probabilities = self.model.predict_proba(features[ready]).max(axis=1) if hasattr(self.model, 'predict_proba') else None
+            except Exception as e:
+                print(f'Model prediction failed, skipping predictions: {e}')
+                return predictions
+
+            predictions.loc[ready, 'Model'] = model_predictions
+            if probabilities is not None:
+                predictions.loc[ready, 'Model %'] = probabilities
+
+        metrics.count('model.predicted', int(ready.sum()))
+        return predictions
+
+    MOVEMENT_COLS = ['Status', 'ID', 'Player', 'Team', 'Opponent', 'Stat Type', 'Old Line', 'Line', 'Line Move', 'Odds Moved']
+
+    def previous_run(self, sportsbook: str):
+        '''
+        The book's stored rows from the previous run (this process's, else the latest in the prop
+        store) and, when the history it was scored against hasn't changed, its scored board.
+
+        ## Returns:
+            **(rows, board)**: *tuple[DataFrame, DataFrame | None]* - `board` is indexed by ID
+        '''
+        rows = self.scored.get(sportsbook)
+        if rows is None:
+            rows = self.prop_store.read(sportsbook, days=1)
+            if not rows.empty:
+                rows = rows[rows['Fetched'] == rows['Fetched'].max()]
+
+        history, board = self.boards.get(sportsbook, (None, None))
+        return rows, board if history == (self.history, self.history.version) else None
+
+    def diff_props(self, frame: pd.DataFrame, previous: pd.DataFrame):
+        '''
+        Classifies props against the previous run by ID, line and book odds.
+
+        ## Returns:
+            **movements**: *DataFrame* - `MOVEMENT_COLS`, Status is 'new', 'moved', 'unchanged' or
+            'removed', current props first in fetched order
+        '''
+        frame = frame.reindex(columns=['ID', 'Player Name', 'Player Team', 'Opp', 'Type', 'Line Score', 'Over Odd', 'Under Odd'])
+        current = pd.DataFrame({
+            'ID': frame['ID'].astype(str).to_numpy(),
+            'Player': frame['Player Name'].to_numpy(),
+            'Team': frame['Player Team'].to_numpy(),
+            'Opponent': frame['Opp'].to_numpy(),
+            'Stat Type': frame['Type'].to_numpy(),
+            'Line': pd.to_numeric(frame['Line Score'], errors='coerce').to_numpy(dtype=float),
+            'Over Odd': pd.to_numeric(frame['Over Odd'], errors='coerce').to_numpy(dtype=float),
+            'Under Odd': pd.to_numeric(frame['Under Odd'], errors='coerce').to_numpy(dtype=float),
+        }).drop_duplicates(subset='ID', keep='last').reset_index(drop=True)
+
+        old = (previous if previous is not None else pd.DataFrame()).reindex(
+            columns=['ID', 'Player', 'Team', 'Opponent', 'Stat Type', 'Line Score', 'Over Odd', 'Under Odd']
+        )
+        old = old.assign(ID=old['ID'].astype(str)).drop_duplicates(subset='ID', keep='last')
+        old[['Line Score', 'Over Odd', 'Under Odd']] = old[['Line Score', 'Over Odd', 'Under Odd']].apply(pd.to_numeric, errors='coerce')
+
+        def moved(new: pd.Series, before: pd.Series):
+            return ~((new == before) | (new.isna() & before.isna()))
+
+        last = old.set_index('ID').reindex(current['ID']).reset_index(drop=True)
+        is_new = ~current['ID'].isin(old['ID']).to_numpy()
+        line_moved = moved(current['Line'], last['Line Score']).to_numpy()
+        odds_moved = (moved(current['Over Odd'], last['Over Odd']) | moved(current['Under Odd'], last['Under Odd'])).to_numpy()
+
+        current = current.assign(
+            **{
+                'Status': np.select([is_new, line_moved | odds_moved], ['new', 'moved'], default='unchanged'),
+                'Old Line': last['Line Score'].to_numpy(),
+                'Odds Moved': odds_moved & ~is_new,
+            }
+        )
+        removed = old[~old['ID'].isin(current['ID'])].rename(columns={'Line Score': 'Old Line'})
+        removed = removed.assign(Status='removed', Line=np.nan, **{'Odds Moved': False})
+
+        movements = pd.concat([current, removed], ignore_index=True)
+        movements['Line Move'] = movements['Line'] - movements['Old Line']
+        return movements[self.MOVEMENT_COLS]
+
+    @metrics.timed('tools.pretty_dataframes')
+    def pretty_dataframes(self, props: list, sportsbook: str, odds: list, sort_by_list: list):
+        '''
+        Resolves, scores and sorts a book's props.
+
+        Props unchanged since the previous run keep its HLTV urls instead of being resolved again,
+        and in a warm process whose history hasn't changed they keep their scored rows too. The
+        diff against that run is kept in `movements[sportsbook]`.
+        '''
+        props = list(props or [])
+        previous, board = self.previous_run(sportsbook)
+        movements = self.diff_props(Prop.frame(props), previous)
+        self.movements[sportsbook] = movements
+
+        unchanged = set(movements.loc[movements['Status'] == 'unchanged', 'ID'])
+        known = {}
+        if previous is not None and not previous.empty:
+            known = dict(zip(previous['ID'].astype(str), zip(previous['URL'], previous['Team URL'], previous['Opp URL'])))
+
+        # Unchanged props that were located last run skip name resolution
+        reused = np.zeros(len(props), dtype=bool)
+        for i, prop in enumerate(props):
+            urls = known.get(str(prop['ID'])) if str(prop['ID']) in unchanged else None
+            if urls is not None and pd.notna(urls[0]):
+                reused[i] = True
+                prop['Player URL'], prop['Team URL'], prop['Opp URL'] = (None if pd.isna(url) else url for url in urls)
+
+        fresh = [prop for prop, skip in zip(props, reused) if not skip]
+        if fresh or not props:
+            self.map_all_data(fresh, sportsbook, report=False)
+        self.attach_odds(props, odds)
+
+        # Match counts and rate cover the whole board, reused props included
         if props:
-            for prop in props:
-                prop_dict: dict = {
-                    col: None for col in df_columns
-                }
-                player_url, player_name, player_team, map_type, prop_line = prop.get('Player URL'), prop.get('Player Name'), prop.get('Player Team'), prop.get('Type'), float(prop.get('Line Score'))
-                
-                prop_dict['Player'] = player_name
-                prop_dict['URL'] = player_url
-                prop_dict['Team'] = player_team
-                prop_dict['Opponent'] = prop.get('Opp')
-                prop_dict['Type'] = fix_type_column(map_type)
-                prop_dict[sportsbook] = prop_line
-
-                if player_url == None:
-                    props_not_found += 1
-                    data_list.append(prop_dict)
-                    continue
-
-                player_values, l15_values, l10_avg, l15_avg = self.previous_game_stats(player_url, map_type)
+            self.report_matches(props, sportsbook, reused=int(reused.sum()))
+        frame = Prop.frame(props)
+
+        # Scored rows are reused only when the board was scored against the same history
+        ids = frame['ID'].astype(str) if not frame.empty else pd.Series([], dtype=str)
+        rescore = ~reused if board is not None else np.ones(len(props), dtype=bool)
+        if board is not None:
+            rescore |= ~ids.isin(board.index).to_numpy() | ids.duplicated(keep=False).to_numpy()
+
+        scored = frame[rescore].reset_index(drop=True)
+        df = self.score_props(scored, sportsbook)
+        df[self.PREDICTION_COLS] = self.predict_props(scored)
+
+        if not rescore.all():
+            kept = board.loc[ids[~rescore]].reset_index(drop=True)
+            kept['Odd'] = np.where(kept['URL'].notna(), frame.loc[~rescore, 'Odd'].to_numpy(dtype=object), None)
+            df = pd.concat([df, kept[df.columns]], ignore_index=True)
+            df.index = np.r_[np.flatnonzero(rescore), np.flatnonzero(~rescore)]
+            df = df.sort_index()
+
+        df = df.reset_index(drop=True)
+        self.scored[sportsbook] = self.stored_props(frame, df, sportsbook)
+        self.boards[sportsbook] = ((self.history, self.history.version), df.set_index(ids.to_numpy()))
+        props_not_found = int(df['URL'].isna().sum())
 
-                if isinstance(l15_values, np.ndarray):
-                    for k, v in enumerate(l15_values, start=1):
-                        prop_dict[f'M{k}'] = v
-        
-                probability, edge, p = self.probability(player_values, prop_line)
-                prop_dict['Chance'] = probability
-                prop_dict['Edge +/-'] = 0 if probability == 0 else edge
-                prop_dict['O/U'] = p
-                
-                prop_dict['L10 Avg'] = l10_avg
-                prop_dict['L10 Diff'] = l10_avg - prop_line if pd.notnull(l10_avg) and pd.notnull(prop_line) else None
-                prop_dict['L15 Avg'] = l15_avg
-                prop_dict['L15 Diff'] = l15_avg - prop_line if pd.notnull(l15_avg) and pd.notnull(prop_line) else None
-                prop_dict['Odd'] = prop.get('Odd')
-                data_list.append(prop_dict)
-        
-        df = pd.DataFrame(data_list)
-        
         # Organize the data
         if not df.empty:
             df.sort_values(by=sort_by_list, inplace=True)
 
         print(f'{props_not_found} props not found on {sportsbook}')
+        print(f'{len(fresh)} of {len(props)} props resolved, {int(rescore.sum())} scored on {sportsbook}')
+        metrics.set(f'{sportsbook}.not_found', props_not_found)
+        metrics.set(f'{sportsbook}.with_history', int(df['Chance'].notna().sum()))
+        metrics.set(f'{sportsbook}.rescored', int(rescore.sum()))
+        for status, count in movements['Status'].value_counts().items():
+            metrics.set(f'{sportsbook}.{status}', int(count))
         return df
 
-    def match_props_dataframe(self, pp_df: pd.DataFrame, ud_df: pd.DataFrame):
+    STORED_COLS = [
+        'ID', 'Game Date', 'Stat Type', 'Player', 'Team', 'Opponent', 'Type', 'Line Score', 'L10 Avg', 'L15 Avg',
+        'Over Odd', 'Under Odd', 'Chance', 'Edge +/-', 'O/U', 'Odd', 'Model', 'Model %', 'URL', 'Team URL', 'Opp URL'
+    ]
+
+    def stored_props(self, frame: pd.DataFrame, df: pd.DataFrame, sportsbook: str):
+        # The scored board plus the prop identity, in the book-independent shape `PropStore` keeps
+        frame = frame.reindex(columns=['ID', 'Game Date', 'Type', 'Over Odd', 'Under Odd', 'Team URL', 'Opp URL'])
+        stored = df.rename(columns={sportsbook: 'Line Score'}).assign(
+            **{
+                'ID': frame['ID'].astype(str).where(frame['ID'].notna(), None).to_numpy(),
+                'Game Date': pd.to_datetime(frame['Game Date'], errors='coerce').dt.strftime('%Y-%m-%d').to_numpy(),
+                'Stat Type': frame['Type'].to_numpy(),
+                'Over Odd': frame['Over Odd'].to_numpy(),
+                'Under Odd': frame['Under Odd'].to_numpy(),
+                'Team URL': frame['Team URL'].to_numpy(),
+                'Opp URL': frame['Opp URL'].to_numpy(),
+            }
+        )
+        return stored.reindex(columns=self.STORED_COLS)
+
+    def save_props(self, sportsbook: str):
+        '''
+        Appends the book's scored props from this run to the prop store.
+        '''
+        stored = self.scored.get(sportsbook)
+        if stored is None or stored.empty:
+            return None
+        return self.prop_store.append(sportsbook, stored)
+
+    @metrics.timed('tools.previous_props_dataframe')
+    def previous_props_dataframe(self, props: list, sportsbook: str, days: int = 7):
+        '''
+        Props offered in the last `days` days that are off the board now, with how they landed.
+
+        Only the store partitions for those days are read. Each prop keeps its last stored line,
+        and when `props` is given only players on the current board are listed.
+
+        ## Returns:
+            **previous_props**: *DataFrame* - With `Actual` from HLTV and `C/W/N` (correct, wrong,
+            no call or no result) for the stored O/U
+        '''
+        df_columns = ['Game Date', 'Player', 'Team', 'Opponent', 'Type', sportsbook, 'Chance', 'O/U', 'Actual', 'C/W/N', 'URL']
+        rows = self.prop_store.read(sportsbook, days)
+        if rows.empty:
+            return pd.DataFrame(columns=df_columns)
+
+        current = Prop.frame(props)
+        if not current.empty:
+            rows = rows[~rows['ID'].isin(current['ID'].astype(str)) & rows['URL'].isin(current['Player URL'].dropna())]
+        rows = rows.sort_values(by='Fetched', kind='stable').drop_duplicates(subset='ID', keep='last')
+
+        actual = []
+        for url, stat_type, game_date in zip(rows['URL'], rows['Stat Type'].astype(str), rows['Game Date']):
+            parts = stat_type.split()
+            value = self.history.value_on(url, parts[1], parts[-1].lower(), game_date) if len(parts) > 2 and url else None
+            actual.append(np.nan if value is None else value)
+
+        rows = rows.assign(Actual=actual).rename(columns={'Line Score': sportsbook})
+        over, under = rows['Actual'] > rows[sportsbook], rows['Actual'] < rows[sportsbook]
+        called_over, called_under = rows['O/U'] == 'O', rows['O/U'] == 'U'
+        rows['C/W/N'] = np.select(
+            [(called_over & over) | (called_under & under), (called_over & under) | (called_under & over)], ['C', 'W'], default='N'
+        )
+        return rows.sort_values(by=['Game Date', 'Team', 'Player'], ascending=[False, True, True])[df_columns].reset_index(drop=True)
+
+    def last_update_dataframe(self):
+        '''
+        One row stamping this run, with how many props each book had.
+        '''
+        counts = {f'{sportsbook} Props': len(df) for sportsbook, df in self.scored.items()}
+        return pd.DataFrame([{'Last Update': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M UTC'), **counts}])
+
+    @metrics.timed('tools.match_props_dataframe')
+    def match_props_dataframe(self, pp_df: pd.DataFrame, ud_df: pd.DataFrame, report_unmatched: bool = False):
         df_columns = ['Player', 'Team', 'Opponent', 'Type'] + [f'M{i}' for i in range(1, 16)] +\
         ['PP', 'UD', 'PP-UD', 'PP Chance', 'PP O/U', 'UD Chance', 'UD O/U', 'Edge +/-', 'Odd', 'URL']
+        keys = ['_url', '_opponent', '_type']
 
-        props_mapped = 0
-        mapped_props_list: list = []
-        
         unique_teams = list(set(list(pp_df['Team'].values) + list(pp_df['Opponent'].values)))
-        pp_props = pp_df.to_dict(orient='records')
-        ud_props = ud_df.to_dict(orient='records')
-
-        # Loop through Prizepicks
-        for pp_prop in pp_props:
-            pp_player_url, pp_opponent_team, pp_stat_type = pp_prop.get('URL'), pp_prop.get('Opponent'), pp_prop.get('Type')
-
-            if pp_player_url is None or pp_opponent_team is None or pp_stat_type is None:
-                continue
-
-            for ud_prop in ud_props:
-                ud_player_url, ud_opponent_team, ud_stat_type = ud_prop.get('URL'), ud_prop.get('Opponent'), ud_prop.get('Type')
-                
-                if ud_player_url is None or pp_opponent_team is None or ud_stat_type is None:
-                    continue
-                
-                # Fuzzy match
-                ud_opponent_team_best = process.extractOne(ud_opponent_team, unique_teams)
-                
-                
-                if (pp_player_url.strip() == ud_player_url.strip()) & (pp_opponent_team.strip() == ud_opponent_team_best[0].strip()) & (pp_stat_type.strip() == ud_stat_type.strip()):
-                    props_mapped += 1
-                    prop_dict: dict = {}
-
-                    # Update the Prizepicks prop with UD information
-                    for df_column in df_columns:
-                        if df_column == 'UD':
-                            prop_dict[df_column] = ud_prop.get('UD')
-                        elif df_column == 'PP-UD':
-                            prop_dict[df_column] = float(pp_prop.get('PP')) - float(ud_prop.get('UD'))
-                        elif df_column == 'PP Chance':
-                            prop_dict[df_column] = pp_prop.get('Chance')
-                        elif df_column == 'PP O/U':
-                            prop_dict[df_column] = pp_prop.get('O/U')
-                        elif df_column == 'UD Chance':
-                            prop_dict[df_column] = ud_prop.get('Chance')
-                        elif df_column == 'UD O/U':
-                            prop_dict[df_column] = ud_prop.get('O/U')
-                        elif df_column == 'Edge +/-':
-                            prop_dict[df_column] = ((pp_prop.get('Chance') + ud_prop.get('Chance')) / 2) - 0.50
-                        else:
-                            prop_dict[df_column] = pp_prop.get(df_column)
-                    mapped_props_list.append(prop_dict)
-                    break
-        
-        print(f'{props_mapped} matches found of PP & UD props')
-        return pd.DataFrame(mapped_props_list).sort_values(by='PP-UD')
-
+        pp = pp_df.dropna(subset=['URL', 'Opponent', 'Type']).copy()
+        ud = ud_df.dropna(subset=['URL', 'Opponent', 'Type']).copy()
+
+        # Resolve each distinct UD opponent to a PP team name once
+        team_matcher = NameMatcher([team for team in unique_teams if pd.notnull(team)], normalize=str)
+        best_opponents = team_matcher.extract_many(ud['Opponent'].unique())
+        ud_opponents = ud['Opponent'].map(lambda team: (best_opponents.get(team) or (None,))[0])
+
+        pp['_pp_row'] = pp.index
+        pp['_url'], pp['_opponent'], pp['_type'] = pp['URL'].str.strip(), pp['Opponent'].str.strip(), pp['Type'].str.strip()
+        ud['_url'], ud['_opponent'], ud['_type'] = ud['URL'].str.strip(), ud_opponents.str.strip(), ud['Type'].str.strip()
+
+        # First UD line per key wins, same as the old nested loop
+        ud = ud.dropna(subset=keys).drop_duplicates(subset=keys, keep='first')
+        ud['_ud_row'] = ud.index
+        ud = ud[keys + ['_ud_row', 'UD', 'Chance', 'O/U']].rename(columns={'Chance': 'UD Chance', 'O/U': 'UD O/U'})
+        merged = pp.merge(ud, on=keys, how='left', indicator=True)
+        matched = merged[merged['_merge'] == 'both'].copy()
+
+        matched['PP-UD'] = matched['PP'].astype(float) - matched['UD'].astype(float)
+        matched['PP Chance'] = matched['Chance']
+        matched['PP O/U'] = matched['O/U']
+        matched['Edge +/-'] = ((matched['PP Chance'] + matched['UD Chance']) / 2) - 0.50
+        df = matched[df_columns].sort_values(by='PP-UD').reset_index(drop=True)
+
+        pp_unmatched = pp_df[~pp_df.index.isin(matched['_pp_row'])]
+        ud_unmatched = ud_df[~ud_df.index.isin(matched['_ud_row'])]
+
+        print(f'{len(df)} matches found of PP & UD props')
+        print(f'{len(pp_unmatched)} PP and {len(ud_unmatched)} UD props left unmatched')
+        metrics.set('PP-UD.matched', len(df))
+        metrics.set('PP-UD.pp_unmatched', len(pp_unmatched))
+        metrics.set('PP-UD.ud_unmatched', len(ud_unmatched))
+        metrics.rate('PP-UD.match_rate', len(df), len(pp_df))
+
+        if report_unmatched:
+            return df, pp_unmatched, ud_unmatched
+        return df
@@ -1,113 +1,117 @@
-from .utils.bot_utils import json_response
-from datetime import datetime
-from pandas import DataFrame
-from thefuzz import process
+from .utils.bot_utils import json_response, fetch_concurrently
+from .props import Prop
+from datetime import datetime, timezone
 
 class UnderDog(object):
 
     def __init__(self):
         pass
 
-    def current_props(self):
-        """
-        Fetches and returns the current props displayed on Underdog Fantasy.
+    def current_props(self, sport: str = 'CS', stream: bool = False):
         """
+        Fetches and returns the current props displayed on Underdog Fantasy for a sport.
 
-        def fetch_teams(url: str = 'https://stats.underdogfantasy.com/v1/teams'):
-            teams = json_response(url)["teams"]
-            return {team.pop("id"): {"abbr": team.get("abbr"), "name": team.get("name")} for team in teams}
+        With `stream=True` a generator is returned that yields each prop as it is built.
+        """
+        url = "https://api.underdogfantasy.com/beta/v5/over_under_lines"
+        responses = fetch_concurrently({"lines": lambda: json_response(url), "teams": self.fetch_teams})
+        lines, teams = responses["lines"], responses["teams"]
+
+        props = self.parse_props(lines, teams, sport)
+        return props if stream else list(props)
+
+    def fetch_teams(self, url: str = 'https://stats.underdogfantasy.com/v1/teams'):
+        teams = json_response(url)["teams"]
+        return {team.pop("id"): {"abbr": team.get("abbr"), "name": team.get("name")} for team in teams}
+
+    @staticmethod
+    def fix_map_name(map_name):
+        if "on" in map_name:
+            parts = map_name.split("on")
+            if len(parts) == 2:
+                swapped = f"{parts[1]} {parts[0]}"
+                return swapped.replace("Map 1", "Maps 1").replace("+", "-").replace("1+2+3", "1-3")
+        return map_name
+
+    def parse_props(self, lines: dict, teams: dict, sport: str = 'CS'):
+        """
+        Yields one `Prop` per over/under line of the requested sport.
 
-        def fix_map_name(map_name):
-            if "on" in map_name:
-                parts = map_name.split("on")
-                if len(parts) == 2:
-                    swapped = f"{parts[1]} {parts[0]}"
-                    return swapped.replace("Map 1", "Maps 1").replace("+", "-").replace("1+2+3", "1-3")
-            return map_name
+        The payload holds every sport, so players are filtered first and appearances, games and
+        lines are indexed by id once instead of being rescanned for every player.
+        """
+        players = [player for player in lines["players"] if player["sport_id"] == sport]
+        player_ids = {player["id"] for player in players}
 
-        url = "https://api.underdogfantasy.com/beta/v5/over_under_lines"
-        lines = json_response(url)
-        teams = fetch_teams()
+        # Lookup tables: player -> appearances, match -> game, appearance -> lines
+        appearances_by_player: dict = {}
+        for appearance in lines["appearances"]:
+            if appearance["player_id"] in player_ids:
+                appearances_by_player.setdefault(appearance["player_id"], []).append(appearance)
 
-        players = lines["players"]
-        games = lines["games"]
-        appearances = lines["appearances"]
-        over_under_lines = lines["over_under_lines"]
+        appearance_ids = {appearance["id"] for appearances in appearances_by_player.values() for appearance in appearances}
+        games = {game["id"]: game for game in lines["games"]}
 
-        data = []
+        lines_by_appearance: dict = {}
+        for line in lines["over_under_lines"]:
+            appearance_id = line["over_under"]["appearance_stat"]["appearance_id"]
+            if appearance_id in appearance_ids:
+                lines_by_appearance.setdefault(appearance_id, []).append(line)
 
         for player in players:
-            if player["sport_id"] != "CS":
-                continue
-
             pl_name = player["last_name"]
             pl_tm_id = player["team_id"]
             pl_id = player["id"]
+            pl_tm_name = teams.get(pl_tm_id, {}).get("name") if pl_tm_id else None
 
-            for appearance in appearances:
-                if appearance["player_id"] != pl_id:
+            for appearance in appearances_by_player.get(pl_id, []):
+                game = games.get(appearance["match_id"])
+                if game is None:
                     continue
 
-                appearance_id = appearance["id"]
-                match_id = appearance["match_id"]
-
-                for game in games:
-                    if game["id"] != match_id:
-                        continue
-
-                    home_tm_id = game["home_team_id"]
-                    away_tm_id = game["away_team_id"]
-                    scheduled_at = datetime.strptime(game["scheduled_at"], "%Y-%m-%dT%H:%M:%SZ")
-                    team_names = game["title"]
-
-                    for line in over_under_lines:
-                        appearance_stat = line["over_under"]["appearance_stat"]
-                        if appearance_stat["appearance_id"] != appearance_id:
-                            continue
-
-                        stat_type = fix_map_name(str(appearance_stat["display_stat"]))
-                        options = line["options"]
-                        line_id = line["id"]
-                        stat_value = line["stat_value"]
-
-                        over_odd = under_odd = 0
-                        if len(options) == 2:
-                            for option in options:
-                                if option["choice_display"] == "Higher":
-                                    over_odd = option["american_price"]
-                                else:
-                                    under_odd = option["american_price"]
-
-                        pl_tm_name = teams.get(pl_tm_id, {}).get("name") if pl_tm_id else None
-                        opp = (
-                            team_names.replace(pl_tm_name, "").replace("vs", " ").strip()
-                            if pl_tm_name else None
-                        )
-                        opp_id = (
-                            away_tm_id if pl_tm_id == home_tm_id
-                            else home_tm_id if pl_tm_id else None
-                        )
-
-                        data.append({
-                            "ID": line_id,
-                            "Game Date": scheduled_at.date(),
-                            "Game Time": scheduled_at.time(),
-                            "Type": stat_type,
-                            "Player Name": pl_name,
-                            "Player Team": pl_tm_name,
-                            "Opp": opp,
-                            "Matchup": team_names,
-                            "Line Score": stat_value,
-                            "Over Odd": over_odd,
-                            "Under Odd": under_odd,
-                            "Player ID": pl_id,
-                            "Team ID": pl_tm_id,
-                            "Opp ID": opp_id,
-                            "Home Team ID": home_tm_id,
-                            "Away Team ID": away_tm_id,
-                        })
-
-        return data
-    
-    
-    
\ No newline at end of file
+                home_tm_id = game["home_team_id"]
+                away_tm_id = game["away_team_id"]
+                scheduled_at = datetime.strptime(game["scheduled_at"], "%Y-%m-%dT%H:%M:%SZ")
+                team_names = game["title"]
+
+                opp = (
+                    team_names.replace(pl_tm_name, "").replace("vs", " ").strip()
+                    if pl_tm_name else None
+                )
+                opp_id = (
+                    away_tm_id if pl_tm_id == home_tm_id
+                    else home_tm_id if pl_tm_id else None
+                )
+
+                for line in lines_by_appearance.get(appearance["id"], []):
+                    appearance_stat = line["over_under"]["appearance_stat"]
+                    stat_type = self.fix_map_name(str(appearance_stat["display_stat"]))
+                    options = line["options"]
+
+                    over_odd = under_odd = 0
+                    if len(options) == 2:
+                        for option in options:
+                            if option["choice_display"] == "Higher":
+                                over_odd = option["american_price"]
+                            else:
+                                under_odd = option["american_price"]
+
+                    yield Prop(
+                        id=line["id"],
+                        game_date=scheduled_at.date(),
+                        game_time=scheduled_at.time(),
+                        start_time=scheduled_at.replace(tzinfo=timezone.utc),
+                        type=stat_type,
+                        player_name=pl_name,
+                        player_team=pl_tm_name,
+                        opp=opp,
+                        matchup=team_names,
+                        line_score=line["stat_value"],
+                        over_odd=over_odd,
+                        under_odd=under_odd,
+                        player_id=pl_id,
+                        team_id=pl_tm_id,
+                        opp_id=opp_id,
+                        home_team_id=home_tm_id,
+                        away_team_id=away_tm_id,
+                    )
@@ -1,14 +1,89 @@
+import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+from .http_cache import ResponseCache
+from .metrics import metrics
 
+TMP_CACHE_DIR = '/tmp/nano-project'
 
-def json_response(url: str, headers = None):
-    response = requests.request(
+
+def cache_dir(path: str = None):
+    '''
+    Directory for the on-disk caches (hltv_cs snapshot, history, aliases, props, HTTP, grids).
+
+    `CACHE_DIR` should point at persistent storage, e.g. the EFS mount the Lambda image expects
+    at `/mnt/efs/nano-project`, so a cold start finds the snapshot and only pulls new rows. When
+    it is unset or not writable (no mount attached) this falls back to `/tmp`, which Lambda
+    empties on every cold start: then only warm containers skip the full `hltv_cs` load.
+    '''
+    path = path or os.environ.get('CACHE_DIR') or TMP_CACHE_DIR
+    try:
+        os.makedirs(path, exist_ok=True)
+        if os.access(path, os.W_OK):
+            return path
+    except OSError:
+        pass
+
+    print(f'Cache directory {path} is not writable, using {TMP_CACHE_DIR}')
+    return TMP_CACHE_DIR
+
+
+CACHE_DIR = cache_dir()
+TIMEOUT = (5, 30) # (connect, read) seconds
+
+# HTTP_CACHE: off, on, record or replay (see ResponseCache)
+response_cache = ResponseCache(os.path.join(CACHE_DIR, 'http'), os.environ.get('HTTP_CACHE', 'on'))
+
+# One keep-alive pool shared by every source
+session = requests.Session()
+session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+session.mount('http://', HTTPAdapter(pool_connections=8, pool_maxsize=16))
+
+
+def json_response(url: str, headers = None, timeout = TIMEOUT, ttl: int = None):
+    cache = response_cache
+    entry = cache.load(url) if cache.mode != 'off' else None
+
+    if cache.mode == 'replay':
+        if entry is None:
+            raise LookupError(f'No recorded response for {url}')
+        metrics.count('http.replayed')
+        return json.loads(entry['body'])
+
+    if cache.mode == 'on' and entry is not None:
+        if cache.fresh(url, entry, ttl):
+            metrics.count('http.fresh')
+            return json.loads(entry['body'])
+        headers = {**(headers or {}), **cache.conditional_headers(entry)}
+
+    response = session.request(
         method='GET',
         url=url,
-        headers=headers
+        headers=headers,
+        timeout=timeout
     )
-    content = response.content
+
+    # Unchanged since the stored copy
+    if response.status_code == 304 and entry is not None:
+        cache.touch(url, entry)
+        metrics.count('http.not_modified')
+        return json.loads(entry['body'])
     
+    metrics.count(f'http.status_{response.status_code}')
     if response.status_code == 200:
+        content = response.content.decode()
+        if cache.mode != 'off':
+            cache.store(url, content, response.headers)
         return json.loads(content)
+
+
+def fetch_concurrently(tasks: dict, max_workers: int = 8):
+    '''
+    Runs each zero-argument callable in `tasks` on a thread pool and returns a dictionary of the
+    same keys to their results. Exceptions are raised once every task has finished.
+    '''
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tasks)))) as executor:
+        futures = {key: executor.submit(task) for key, task in tasks.items()}
+    return {key: future.result() for key, future in futures.items()}
@@ -0,0 +1,79 @@
+import os
+import gzip
+import json
+import time
+import hashlib
+
+# Seconds a stored response is served without asking the server, by URL prefix.
+# Anything else is revalidated on every call.
+TTLS = {
+    'https://stats.underdogfantasy.com/v1/teams': 24 * 60 * 60,
+}
+
+
+class ResponseCache:
+    MODES = {'off', 'on', 'record', 'replay'}
+
+    def __init__(self, directory: str, mode: str = 'on'):
+        '''
+        Gzipped on-disk store of JSON responses with their ETag/Last-Modified validators.
+
+        Modes:
+            **off**: every call goes to the network.
+            **on**: fresh entries (within their TTL) are served from disk, stale ones are revalidated with a conditional GET.
+            **record**: every call goes to the network and the body is stored.
+            **replay**: nothing goes to the network, stored bodies are served regardless of age.
+        '''
+        if mode not in self.MODES:
+            raise ValueError(f'Unknown cache mode {mode!r}, expected one of {sorted(self.MODES)}')
+
+        self.directory = directory
+        self.mode = mode
+
+    def path(self, url: str):
+        return os.path.join(self.directory, hashlib.sha1(url.encode()).hexdigest() + '.json.gz')
+
+    def ttl(self, url: str):
+        return next((ttl for prefix, ttl in TTLS.items() if url.startswith(prefix)), 0)
+
+    def load(self, url: str):
+        try:
+            with gzip.open(self.path(url), 'rt') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, url: str, body: str, headers: dict):
+        entry = {
+            'url': url,
+            'fetched_at': time.time(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'body': body,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{self.path(url)}.tmp'
+            with gzip.open(tmp_path, 'wt') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.path(url))
+        except OSError as e:
+            print(f'Response for {url} not cached: {e}')
+        return entry
+
+    def touch(self, url: str, entry: dict):
+        entry['fetched_at'] = time.time()
+        return self.store(url, entry['body'], {'ETag': entry.get('etag'), 'Last-Modified': entry.get('last_modified')})
+
+    def fresh(self, url: str, entry: dict, ttl: int = None):
+        ttl = self.ttl(url) if ttl is None else ttl
+        return time.time() - entry.get('fetched_at', 0) < ttl
+
+    @staticmethod
+    def conditional_headers(entry: dict):
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
@@ -0,0 +1,76 @@
+import json
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+
+
+class RunMetrics:
+    def __init__(self):
+        '''
+        Timing spans and counters for one pipeline run, emitted as a single JSON record.
+
+        Spans with the same name add up (e.g. `tools.map_all_data` runs once per book), and
+        counters are plain numbers set or incremented by the stages.
+        '''
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, **fields):
+        with self.lock:
+            self.started = time.perf_counter()
+            self.fields = dict(fields)
+            self.spans: dict = {}
+            self.counters: dict = {}
+
+    @contextmanager
+    def span(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self.lock:
+                self.spans[name] = self.spans.get(name, 0.0) + elapsed
+
+    def timed(self, name: str):
+        '''
+        Decorator form of `span`.
+        '''
+        def decorator(function):
+            @wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def count(self, name: str, value: float = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set(self, name: str, value):
+        with self.lock:
+            self.counters[name] = value
+
+    def rate(self, name: str, hits: float, total: float):
+        self.set(name, round(hits / total, 4) if total else None)
+
+    def record(self, **fields):
+        with self.lock:
+            return {
+                **self.fields,
+                **fields,
+                'total_seconds': round(time.perf_counter() - self.started, 4),
+                'spans': {name: round(seconds, 4) for name, seconds in self.spans.items()},
+                'counters': dict(self.counters),
+            }
+
+    def emit(self, **fields):
+        record = self.record(**fields)
+        print(json.dumps(record, default=str))
+        return record
+
+
+# The current run, reset at the start of each invocation
+metrics = RunMetrics()
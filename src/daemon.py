@@ -0,0 +1,174 @@
+'''
+Long-running alternative to `lambda_handler.handler`.
+
+    python daemon.py [--hltv-minutes 30]
+
+`Tools` (hltv_cs, indexes, mappers, model) is loaded once and kept warm, HLTV data is refreshed
+incrementally on a background thread, and each source is polled on its own interval, faster
+as its next match gets close. Sheets are written only when a published frame changes.
+'''
+import time
+import argparse
+import threading
+from datetime import datetime, timezone
+import pandas as pd
+
+import bot
+from bot.tools import Tools
+from bot.utils.metrics import metrics
+from lambda_handler import sheet_updates, LAST_UPDATE_SHEET
+
+# Seconds between polls: (no match soon, match within 2 hours, match within 30 minutes)
+POLL_SECONDS = {
+    'PP': (900, 300, 60),
+    'UD': (900, 300, 60),
+    'Bovado': (1800, 600, 120),
+}
+
+
+def poll_interval(source: str, props: list, now: datetime = None):
+    slow, normal, fast = POLL_SECONDS[source]
+    now = now or datetime.now(timezone.utc)
+
+    upcoming = [prop.start_time for prop in props or [] if prop.start_time is not None and prop.start_time > now]
+    if not upcoming:
+        return slow
+
+    seconds = (min(upcoming) - now).total_seconds()
+    return fast if seconds <= 1800 else normal if seconds <= 7200 else slow
+
+
+class Daemon:
+    def __init__(self, hltv_seconds: int = 1800, tools: Tools = None, gs=None):
+        '''
+        Warm pipeline state plus the latest fetch and next poll time of each source.
+        '''
+        self.hltv_seconds = hltv_seconds
+        self.sources = {
+            'PP': lambda: bot.pp.current_props(),
+            'UD': lambda: bot.ud.current_props(),
+            'Bovado': lambda: list(bot.bv.current_odds()),
+        }
+        self.latest = {name: None for name in self.sources}
+        self.fingerprints = {name: None for name in self.sources}
+        self.due = {name: 0.0 for name in self.sources}
+        self.digests: dict = {}
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.stale = threading.Event()
+
+        self.tools = tools or Tools().preload('cs_data', 'model', 'team_mapper', 'player_mapper')
+        self.tools.history, self.tools.team_matcher, self.tools.player_matcher
+        self.gs = gs or bot.gs
+
+    def refresh_loop(self):
+        while not self.stopped.wait(self.hltv_seconds):
+            try:
+                new_rows = self.tools.refresh(self.lock)
+                print(f'HLTV refresh: {new_rows} new rows')
+                if new_rows:
+                    self.stale.set() # Scores changed even if no source did
+            except Exception as e:
+                print(f'HLTV refresh failed: {e}')
+
+    def poll(self):
+        '''
+        Fetches every source that is due and returns whether any of them changed.
+        '''
+        changed = False
+        now = time.monotonic()
+
+        for name, fetch in self.sources.items():
+            if self.due[name] > now:
+                continue
+
+            try:
+                rows = fetch()
+            except Exception as e:
+                # The last rows stay; they already carry scoring's urls, so they aren't fingerprinted again
+                print(f'{name} fetch failed: {e}')
+                rows = None
+
+            # Taken before scoring fills in urls and odds on the records
+            fingerprint = self.fingerprint(rows)
+            if rows is not None and fingerprint != self.fingerprints[name]:
+                self.latest[name], self.fingerprints[name] = rows, fingerprint
+                changed = True
+
+            # Odds follow whichever book has the closest match
+            props = self.latest[name] if name != 'Bovado' else (self.latest['PP'] or []) + (self.latest['UD'] or [])
+            self.due[name] = time.monotonic() + poll_interval(name, props)
+
+        return changed
+
+    @staticmethod
+    def fingerprint(rows: list):
+        if rows is None:
+            return None
+        return [tuple(getattr(row, attr) for attr in row.__slots__) for row in rows]
+
+    @staticmethod
+    def digest(df: pd.DataFrame):
+        if df is None:
+            return None
+        return (tuple(df.columns), int(pd.util.hash_pandas_object(df.astype(str), index=False).sum()))
+
+    def publish(self):
+        pp_props, ud_props, odds = self.latest['PP'], self.latest['UD'], self.latest['Bovado']
+        if not pp_props and not ud_props:
+            return False
+
+        with self.lock:
+            updates = sheet_updates(self.tools, self.gs, pp_props, ud_props, odds or [])
+
+        # The last-update stamp always differs, so it only goes out with a real change
+        digests = {
+            str(worksheet.id): self.digest(df) for worksheet, df in updates
+            if str(worksheet.id) != str(LAST_UPDATE_SHEET)
+        }
+        if digests == self.digests:
+            print('Output unchanged, Sheets not updated')
+            return False
+
+        with metrics.span('run.sheets'):
+            self.gs.update_worksheets(updates)
+        self.digests = digests
+        return True
+
+    def run(self):
+        threading.Thread(target=self.refresh_loop, name='hltv-refresh', daemon=True).start()
+
+        while not self.stopped.is_set():
+            metrics.reset(mode='daemon')
+            status = 200
+            try:
+                if self.poll() or self.stale.is_set():
+                    self.stale.clear()
+                    self.publish()
+            except Exception as e:
+                status = 500
+                print(f'Daemon cycle failed: {e}')
+            finally:
+                if metrics.spans:
+                    metrics.emit(event='nano_run', status=status)
+
+            self.stopped.wait(max(1.0, min(self.due.values()) - time.monotonic()))
+
+    def stop(self):
+        self.stopped.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--hltv-minutes', type=float, default=30, help='Minutes between incremental hltv_cs refreshes')
+    args = parser.parse_args()
+
+    daemon = Daemon(hltv_seconds=int(args.hltv_minutes * 60))
+    try:
+        daemon.run()
+    except KeyboardInterrupt:
+        daemon.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,21 +1,35 @@
-from bot.tools import Tools
-from bot import pp, ud, gs, bv
+import time
+import_started = time.perf_counter()
 
-def run():
-    print("Starting Google Sheet update...")
+import bot
+from bot.sources import fetch_all_sources
+from bot.utils.metrics import metrics
+
+import_seconds = time.perf_counter() - import_started
+cold_start = True
+
+# Stamped on every run, so it never counts as a change on its own
+LAST_UPDATE_SHEET = 2040151409
 
-    pp_props = pp.current_props()
-    ud_props = ud.current_props()
-    odds = bv.current_odds()
+def sheet_updates(tools, gs, pp_props: list, ud_props: list, odds: list):
+    '''
+    Scores both books and returns the `(worksheet, DataFrame)` pairs to publish.
+    Shared by the Lambda handler and the long-running daemon.
+    '''
+    with metrics.span('run.score'):
+        df_1 = tools.pretty_dataframes(props=pp_props, sportsbook='PP', odds=odds, sort_by_list=['Team', 'Opponent', 'Player'])
+        df_2 = tools.pretty_dataframes(props=ud_props, sportsbook='UD', odds=odds, sort_by_list=['Team', 'Opponent', 'Player'])
 
-    tools = Tools()
+    with metrics.span('run.match'):
+        df_3 = tools.match_props_dataframe(df_1, df_2)
 
-    df_1, df_1a = tools.pretty_dataframes(props=pp_props, sportsbook='PP', odds=odds, sort_by_list=['Team', 'Opponent', 'Player'])
-    df_2, df_2a = tools.pretty_dataframes(props=ud_props, sportsbook='UD', odds=odds, sort_by_list=['Team', 'Opponent', 'Player'])
-    df_3 = tools.match_props_dataframe(df_1, df_2)
-    df_4 = tools.previous_props_dataframe(props=pp_props, sportsbook='PP', days=7)
-    df_5 = tools.previous_props_dataframe(props=ud_props, sportsbook='UD', days=7)
-    df_6 = tools.last_update_dataframe()
+    with metrics.span('run.history'):
+        # This run's lines go into the prop store first, then the 7-day sheets read it back
+        tools.save_props('PP')
+        tools.save_props('UD')
+        df_4 = tools.previous_props_dataframe(props=pp_props, sportsbook='PP', days=7)
+        df_5 = tools.previous_props_dataframe(props=ud_props, sportsbook='UD', days=7)
+        df_6 = tools.last_update_dataframe()
 
     # GSheet updates
     sheet_ids = [
@@ -24,22 +38,62 @@ def run():
         ('686271289', df_3),
         ('2072968799', df_4),
         ('1498038724', df_5),
-        (2040151409, df_6),
-        ('1359208711', df_1a),
-        ('275648232', df_2a),
+        (LAST_UPDATE_SHEET, df_6),
     ]
 
-    for sheet_id, dataframe in sheet_ids:
-        wi = gs.worksheet_instance(sheet_id)
-        gs.update_worksheet(wi, dataframe)
+    # Lines that appeared, moved or came off the board since the previous run. None moving is
+    # published too, as a header-only grid, so the previous run's moves don't stay up
+    movements = [
+        (f'{sportsbook} Movements', df[df['Status'] != 'unchanged'])
+        for sportsbook, df in tools.movements.items()
+    ]
+
+    # An empty board (e.g. a book that failed to load) keeps what the sheet already shows
+    return (
+        [(gs.worksheet_instance(sheet_id), None if dataframe is None or dataframe.empty else dataframe) for sheet_id, dataframe in sheet_ids] +
+        [(gs.worksheet_by_title(title), dataframe) for title, dataframe in movements]
+    )
+
+def run():
+    print("Starting Google Sheet update...")
+
+    with metrics.span('run.fetch'):
+        sources = fetch_all_sources(bot.pp, bot.ud, bot.bv)
+    pp_props, ud_props, odds = sources['PP'], sources['UD'], sources['Bovado']
+    for source, rows in sources.items():
+        metrics.set(f'{source}.fetched', len(rows or []))
+
+    # Nothing to score, skip loading HLTV data and the Sheets client entirely
+    if not pp_props and not ud_props:
+        print("No props on any source, nothing to update.")
+        return
+
+    with metrics.span('run.load'):
+        from bot.tools import Tools
+        gs = bot.gs
+        tools = Tools().preload('cs_data', 'model', 'team_mapper', 'player_mapper')
+
+    updates = sheet_updates(tools, gs, pp_props, ud_props, odds)
+
+    # Only changed cells, all worksheets in one batched request
+    with metrics.span('run.sheets'):
+        gs.update_worksheets(updates)
 
     print("Google Sheet update complete.")
 
 def handler(event=None, context=None):
+    global cold_start
     print("Lambda invoked")
+    metrics.reset(cold_start=cold_start, import_seconds=round(import_seconds, 4))
+    status = 200
     try:
         run()
         return {"statusCode": 200, "body": "Update complete"}
     except Exception as e:
+        status = 500
         print(f"Lambda failed: {e}")
-        return {"statusCode": 500, "body": str(e)}
\ No newline at end of file
+        return {"statusCode": 500, "body": str(e)}
+    finally:
+        # One structured record per run, for latency and match-rate alerts
+        metrics.emit(event="nano_run", status=status)
+        cold_start = False
\ No newline at end of file
@@ -0,0 +1,72 @@
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Caches go to a throwaway directory and nothing is fetched or replayed
+os.environ.setdefault('CACHE_DIR', tempfile.mkdtemp(prefix='nano-tests-'))
+os.environ.setdefault('HTTP_CACHE', 'off')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+import pytest # noqa: E402
+from bot.tools import Tools # noqa: E402
+from bot.aliases import AliasCache # noqa: E402
+from bot.prop_store import PropStore # noqa: E402
+from synthetic import make_hltv, make_mappers # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def hltv():
+    return make_hltv(players=60, matches=300)
+
+
+@pytest.fixture
+def make_tools(hltv, tmp_path):
+    '''
+    Builds `Tools` over the synthetic history, with no model and caches under `tmp_path`.
+    Tools made by one test share their alias cache file and prop store.
+    '''
+    team_mapper, player_mapper = make_mappers(hltv)
+
+    def make_tools(**data):
+        return Tools(**{
+            'cs_data': hltv,
+            'model': None,
+            'team_mapper': team_mapper,
+            'player_mapper': player_mapper,
+            'aliases': AliasCache(str(tmp_path / 'aliases.json')),
+            'prop_store': PropStore(str(tmp_path / 'props')),
+            **data,
+        })
+    return make_tools
+
+
+class FakeWorksheet:
+    def __init__(self, id, title: str = None):
+        self.id = id
+        self.title = title or str(id)
+
+
+class FakeSheets:
+    '''
+    Stands in for `GoogleSheet`, keeping the frames each batched update would have written.
+    '''
+    def __init__(self):
+        self.worksheets: dict = {}
+        self.written: list = []
+
+    def worksheet_instance(self, id):
+        return self.worksheets.setdefault(str(id), FakeWorksheet(id))
+
+    def worksheet_by_title(self, title: str):
+        return self.worksheets.setdefault(title, FakeWorksheet(f'new-{title}', title))
+
+    def update_worksheets(self, updates: list):
+        self.written.append({worksheet.title: df for worksheet, df in updates})
+
+
+@pytest.fixture
+def sheets():
+    return FakeSheets()
@@ -0,0 +1,110 @@
+import numpy as np
+import pandas as pd
+import pytest
+from bot.history import HistoryIndex
+from bot.backtest import Backtest, grid, sweep
+from test_history import reference_values
+
+WEIGHTS = np.array([0.25, 0.20, 0.15, 0.125, 0.115, 0.10, 0.05, 0.01])
+STAT_TYPES = {'MAPS 1 Kills': ((1,), 'kills'), 'MAPS 1-2 Kills': ((1, 2), 'kills'), 'MAPS 1-2 Headshots': ((1, 2), 'headshots')}
+
+
+@pytest.fixture(scope='module')
+def lines(hltv):
+    '''
+    Past lines on days the player did play, so the game itself is in `hltv`. Every fifth
+    line settles exactly on its line score (a push).
+    '''
+    rng = np.random.default_rng(5)
+    rows = []
+    for i, player_url in enumerate(hltv['player_url'].unique()[:40]):
+        # Days with a second map, so every stat type has the game in `hltv`
+        dates = hltv.loc[(hltv['player_url'] == player_url) & (hltv['map_number'] == 2), 'date'].unique()
+        stat_type = list(STAT_TYPES)[i % len(STAT_TYPES)]
+        line = float(rng.integers(4, 30)) + (0 if i % 5 == 0 else 0.5)
+        rows.append({
+            'Game Date': pd.Timestamp(dates[rng.integers(len(dates) // 2, len(dates))]).strftime('%Y-%m-%d'),
+            'Stat Type': stat_type,
+            'Player URL': player_url,
+            'Line Score': line,
+            'Actual': line if i % 5 == 0 else float(rng.integers(4, 40)),
+        })
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture(scope='module')
+def history(hltv):
+    return HistoryIndex(hltv)
+
+
+@pytest.fixture(scope='module')
+def backtest(lines, history):
+    return Backtest(lines, history)
+
+
+def prior_values(hltv: pd.DataFrame, line: pd.Series):
+    # The player's matches strictly before the game day, most recent first
+    maps, stat = STAT_TYPES[line['Stat Type']]
+    prior = hltv[hltv['date'] < pd.Timestamp(line['Game Date'])]
+    values = reference_values(prior, line['Player URL'], maps, stat)
+    return np.empty(0) if values is None else values
+
+
+def test_history_stops_before_game_day(hltv, lines, backtest):
+    for i, line in lines.iterrows():
+        expected = prior_values(hltv, line)
+        np.testing.assert_allclose(backtest.values[i, :backtest.lengths[i]], expected)
+
+        # The game itself (and anything later) is in the full history but never used
+        maps, stat = STAT_TYPES[line['Stat Type']]
+        assert len(reference_values(hltv, line['Player URL'], maps, stat)) > len(expected)
+
+
+def test_chances_match_hand_computed_fractions(hltv, lines, backtest):
+    windowed, weighted = backtest.chances(window=5), backtest.chances(weights=WEIGHTS)
+
+    for i, line in lines.iterrows():
+        values = prior_values(hltv, line)
+        if len(values) == 0:
+            assert np.isnan(windowed[i]) and np.isnan(weighted[i])
+            continue
+
+        recent = values[:5]
+        assert np.isclose(windowed[i], np.mean(recent >= line['Line Score']))
+
+        recent = values[:len(WEIGHTS)]
+        weights = WEIGHTS[:len(recent)]
+        assert np.isclose(weighted[i], (weights * (recent >= line['Line Score'])).sum() / weights.sum())
+
+
+@pytest.mark.parametrize('min_edge, min_matches', [(0.0, 1), (0.1, 5), (0.2, 20)])
+def test_evaluate_counts_calls(hltv, lines, history, backtest, min_edge, min_matches):
+    chances = backtest.chances(window=10)
+    bets = correct = settled = 0
+    for i, line in lines.iterrows():
+        if line['Actual'] == line['Line Score']:
+            continue
+        settled += 1
+
+        length = len(prior_values(hltv, line))
+        if np.isnan(chances[i]) or length < min_matches or abs(chances[i] - 0.5) <= min_edge:
+            continue
+        bets += 1
+        correct += (chances[i] > 0.5) == (line['Actual'] > line['Line Score'])
+
+    result = backtest.evaluate(window=10, min_edge=min_edge, min_matches=min_matches)
+    assert bets > 0
+    assert result['bets'] == bets
+    assert result['coverage'] == bets / settled
+    assert result['hit_rate'] == pytest.approx(correct / bets)
+
+    # Pushes never count, whatever their chance
+    pushes = lines['Actual'] == lines['Line Score']
+    assert pushes.any()
+    without = Backtest(lines[~pushes], history).evaluate(window=10, min_edge=min_edge, min_matches=min_matches)
+    assert {k: without[k] for k in ('bets', 'hit_rate', 'coverage')} == {k: result[k] for k in ('bets', 'hit_rate', 'coverage')}
+
+
+def test_sweep_is_the_same_across_workers(backtest):
+    configs = grid(WEIGHTS, windows=(5, 10, None), min_edges=(0.0, 0.1), min_matches=(1, 5))
+    pd.testing.assert_frame_equal(sweep(backtest, configs, workers=1), sweep(backtest, configs, workers=2))
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta, timezone
+import lambda_handler
+from daemon import Daemon, poll_interval
+from bot.googlesheet import GoogleSheet
+from synthetic import make_props, make_odds
+
+
+def test_sheet_updates_with_fakes(hltv, make_tools, sheets):
+    tools = make_tools()
+    updates = lambda_handler.sheet_updates(tools, sheets, make_props(hltv, 60, 'PP'), make_props(hltv, 60, 'UD', seed=7), make_odds(hltv))
+
+    titles = [worksheet.title for worksheet, _ in updates]
+    assert titles[:2] == ['88012551', '1121328359'] and titles[-2:] == ['PP Movements', 'UD Movements']
+    # Both boards and both movements sheets go out, the empty 7-day history sheets don't
+    published = [worksheet.title for worksheet, df in updates if df is not None]
+    assert published == titles[:3] + [str(lambda_handler.LAST_UPDATE_SHEET)] + titles[-2:]
+
+
+def test_steady_board_blanks_movements(hltv, make_tools, sheets):
+    tools = make_tools()
+    boards = lambda: (make_props(hltv, 60, 'PP'), make_props(hltv, 60, 'UD', seed=7), make_odds(hltv))
+    lambda_handler.sheet_updates(tools, sheets, *boards())
+    updates = dict((worksheet.title, df) for worksheet, df in lambda_handler.sheet_updates(tools, sheets, *boards()))
+
+    # Nothing moved: a header-only grid replaces the previous run's moves
+    for title in ('PP Movements', 'UD Movements'):
+        assert updates[title].empty and GoogleSheet.to_grid(updates[title].copy()) == [list(tools.MOVEMENT_COLS)]
+
+    # An empty board is left as the sheet shows it
+    updates = dict((worksheet.title, df) for worksheet, df in lambda_handler.sheet_updates(tools, sheets, [], *boards()[1:]))
+    assert updates['88012551'] is None and updates['1121328359'] is not None
+
+
+def test_publish_writes_only_changes(hltv, make_tools, sheets):
+    daemon = Daemon(tools=make_tools(), gs=sheets)
+    state = {'moved': 0, 'ud_down': False}
+
+    def fetch_pp():
+        # Fresh records on every fetch, like the real sources
+        props = make_props(hltv, 60, 'PP')
+        for prop in props[:state['moved']]:
+            prop.line_score += 1
+        return props
+
+    def fetch_ud():
+        if state['ud_down']:
+            raise ConnectionError('Underdog down')
+        return make_props(hltv, 60, 'UD', seed=7)
+
+    daemon.sources = {'PP': fetch_pp, 'UD': fetch_ud, 'Bovado': lambda: make_odds(hltv)}
+
+    def cycle():
+        daemon.due = {name: 0.0 for name in daemon.due}
+        return daemon.poll() and daemon.publish()
+
+    assert cycle()
+    assert len(sheets.written) == 1 and len(sheets.written[0]['88012551']) == 60
+
+    # Same boards again, or a failed fetch: nothing changed, Sheets untouched
+    assert not cycle()
+    state['ud_down'] = True
+    assert not cycle()
+    assert len(sheets.written) == 1
+
+    # A moved line goes out
+    state['moved'] = 1
+    assert cycle()
+    assert len(sheets.written) == 2
+
+
+def test_poll_interval_speeds_up_near_start(hltv):
+    now = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+    props = make_props(hltv, 3, 'PP')
+
+    for minutes, expected in ((600, 900), (90, 300), (20, 60)):
+        props[0].start_time = now + timedelta(minutes=minutes)
+        assert poll_interval('PP', props, now) == expected
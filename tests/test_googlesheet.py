@@ -0,0 +1,115 @@
+import gspread
+import pandas as pd
+import pytest
+from bot.googlesheet import GoogleSheet
+from conftest import FakeWorksheet
+
+
+class FakeClient:
+    '''
+    Stands in for the gspread spreadsheet, recording the bodies of the batched calls.
+    '''
+    id = 'spreadsheet'
+
+    def __init__(self):
+        self.cleared: list = []
+        self.updated: list = []
+        self.fail = False
+
+    def worksheets(self):
+        return []
+
+    def values_batch_clear(self, body: dict):
+        self.cleared.append(body)
+
+    def values_batch_update(self, body: dict):
+        if self.fail:
+            raise ConnectionError('Sheets API unavailable')
+        self.updated.append(body)
+        return body
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def make_sheet(client, tmp_path, monkeypatch):
+    class Login:
+        def open_by_url(self, url):
+            return client
+
+    monkeypatch.setattr(gspread, 'service_account', lambda filename: Login())
+
+    def make_sheet():
+        # Each instance starts from the grids cached on disk, like a new process
+        return GoogleSheet(sheet_url='https://sheets.example/sheet', cache_dir=str(tmp_path / 'sheets'))
+    return make_sheet
+
+
+def board(rows: int):
+    return pd.DataFrame({'Player': [f'player{i}' for i in range(rows)], 'Line': [20.5 + i for i in range(rows)], 'URL': 'u'})
+
+
+def written(client: FakeClient):
+    return {data['range']: data['values'][0] for data in client.updated[-1]['data']}
+
+
+def test_unknown_worksheet_is_cleared_and_written(make_sheet, client):
+    worksheet = FakeWorksheet(1, 'PP')
+    make_sheet().update_worksheets([(worksheet, board(3))])
+
+    assert client.cleared == [{'ranges': ["'PP'"]}]
+    assert written(client) == {
+        "'PP'!A1:C1": ['Player', 'Line', 'URL'],
+        "'PP'!A2:C2": ['player0', '20.5', 'u'],
+        "'PP'!A3:C3": ['player1', '21.5', 'u'],
+        "'PP'!A4:C4": ['player2', '22.5', 'u'],
+    }
+
+
+def test_unchanged_grid_makes_no_call(make_sheet, client):
+    worksheet = FakeWorksheet(1, 'PP')
+    make_sheet().update_worksheets([(worksheet, board(3))])
+
+    # Same process and a new one reading the grid back from disk
+    for sheet in (make_sheet(), make_sheet()):
+        assert sheet.update_worksheets([(worksheet, board(3))]) is None
+    assert len(client.updated) == 1 and len(client.cleared) == 1
+
+
+def test_shrinking_grid_blanks_trailing_cells(make_sheet, client):
+    worksheet = FakeWorksheet(1, 'PP')
+    sheet = make_sheet()
+    sheet.update_worksheets([(worksheet, board(3))])
+
+    smaller = board(1)[['Player', 'Line']].assign(Line=99.5)
+    sheet.update_worksheets([(worksheet, smaller)])
+    assert written(client) == {
+        "'PP'!C1:C1": [''],
+        "'PP'!B2:C2": ['99.5', ''],
+        "'PP'!A3:C3": ['', '', ''],
+        "'PP'!A4:C4": ['', '', ''],
+    }
+
+    # A header-only grid blanks every row below it
+    sheet.update_worksheets([(worksheet, smaller.iloc[0:0])])
+    assert written(client) == {"'PP'!A2:B2": ['', '']}
+
+
+def test_failed_update_keeps_the_last_grid(make_sheet, client):
+    worksheet = FakeWorksheet(1, 'PP')
+    sheet = make_sheet()
+    sheet.update_worksheets([(worksheet, board(3))])
+
+    client.fail = True
+    with pytest.raises(ConnectionError):
+        sheet.update_worksheets([(worksheet, board(2))])
+
+    # The next run still diffs against what the sheet really shows
+    client.fail = False
+    for sheet in (sheet, make_sheet()):
+        assert sheet.last_grid(worksheet) == GoogleSheet.to_grid(board(3))
+    sheet.update_worksheets([(worksheet, board(2))])
+    assert written(client) == {"'PP'!A4:C4": ['', '', '']}
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+from bot.history import HistoryIndex
+
+
+def reference_values(cs_data: pd.DataFrame, player_url: str, maps: tuple, stat: str):
+    # The pre-index per-player filter: every row of the player on those maps, complete matches only
+    df = cs_data[(cs_data['player_url'] == player_url) & cs_data['map_number'].isin(maps)]
+    df = df.groupby('match_url').filter(lambda match: len(match) == len(maps))
+    if df.empty:
+        return None
+
+    per_match = df.groupby('match_url').agg(value=(stat, 'sum'), date=('date', 'max')).reset_index()
+    per_match = per_match.sort_values(by=['date', 'match_url'], ascending=False)
+    return per_match['value'].to_numpy(dtype=float)
+
+
+def test_values_match_per_player_filter(hltv):
+    history = HistoryIndex(hltv)
+
+    for player_url in hltv['player_url'].unique()[:15]:
+        for label, maps in HistoryIndex.MAP_LABELS.items():
+            for stat in ('kills', 'rating'):
+                expected = reference_values(hltv, player_url, maps, stat)
+                values = history.values(player_url, label, stat)
+
+                if expected is None:
+                    assert values is None
+                else:
+                    np.testing.assert_allclose(values, expected)
+                    _, l10_avg, l15_avg = history.summary(player_url, label, stat)
+                    assert np.isclose(l10_avg, expected[:10].mean())
+                    assert np.isclose(l15_avg, expected[:15].mean())
+
+
+def test_update_matches_full_build(hltv):
+    # The last 40 matches arrive in a later sync
+    late = set(hltv['match_url'].unique()[-40:])
+    history = HistoryIndex(hltv[~hltv['match_url'].isin(late)])
+    history.update(hltv[hltv['match_url'].isin(late)])
+    built = HistoryIndex(hltv)
+
+    assert history.index.keys() == built.index.keys()
+    for key, values in built.index.items():
+        np.testing.assert_array_equal(history.index[key], values)
+        np.testing.assert_array_equal(history.matches[key][0], built.matches[key][0])
+        np.testing.assert_array_equal(history.matches[key][1], built.matches[key][1])
+        np.testing.assert_allclose(history.summaries[key], built.summaries[key])
+
+
+def test_update_replaces_corrected_match(hltv):
+    match_url = hltv['match_url'].iloc[0]
+    corrected = hltv[hltv['match_url'] == match_url].assign(kills=99)
+    history = HistoryIndex(hltv).update(corrected)
+    built = HistoryIndex(pd.concat([hltv[hltv['match_url'] != match_url], corrected]))
+
+    for key, values in built.index.items():
+        np.testing.assert_array_equal(history.index[key], values)
@@ -0,0 +1,100 @@
+import json
+import pytest
+from bot.utils import bot_utils
+from bot.utils.http_cache import ResponseCache
+
+URL = 'https://api.example.com/projections'
+TEAMS_URL = 'https://stats.underdogfantasy.com/v1/teams'
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, body=None, headers: dict = None):
+        self.status_code = status_code
+        self.content = json.dumps(body).encode() if body is not None else b''
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def server(monkeypatch):
+    '''
+    Stubs `session.request`: answers with the queued responses and records each request's headers.
+    '''
+    class Server:
+        def __init__(self):
+            self.responses: list = []
+            self.requests: list = []
+
+        def request(self, method: str, url: str, headers=None, timeout=None):
+            self.requests.append(headers or {})
+            return self.responses.pop(0)
+
+    server = Server()
+    monkeypatch.setattr(bot_utils.session, 'request', server.request)
+    return server
+
+
+@pytest.fixture
+def use_cache(tmp_path, monkeypatch):
+    def use_cache(mode: str):
+        cache = ResponseCache(str(tmp_path / 'http'), mode)
+        monkeypatch.setattr(bot_utils, 'response_cache', cache)
+        return cache
+    return use_cache
+
+
+def test_not_modified_reuses_the_stored_body(server, use_cache):
+    cache = use_cache('on')
+    server.responses = [FakeResponse(200, {'data': [1]}, {'ETag': '"v1"', 'Last-Modified': 'Sun, 18 Oct 2026 12:00:00 GMT'})]
+    assert bot_utils.json_response(URL) == {'data': [1]}
+    fetched_at = cache.load(URL)['fetched_at']
+
+    server.responses = [FakeResponse(304)]
+    assert bot_utils.json_response(URL) == {'data': [1]}
+    assert server.requests[-1] == {'If-None-Match': '"v1"', 'If-Modified-Since': 'Sun, 18 Oct 2026 12:00:00 GMT'}
+    assert cache.load(URL)['fetched_at'] >= fetched_at
+
+    # A changed body replaces the stored one
+    server.responses = [FakeResponse(200, {'data': [2]}, {'ETag': '"v2"'})]
+    assert bot_utils.json_response(URL) == {'data': [2]}
+    assert cache.load(URL)['etag'] == '"v2"'
+
+
+def test_fresh_entries_skip_the_network(server, use_cache):
+    use_cache('on')
+    server.responses = [FakeResponse(200, {'teams': []}), FakeResponse(200, {'data': [1]}, {'ETag': '"v1"'})]
+    bot_utils.json_response(TEAMS_URL)
+    bot_utils.json_response(URL, ttl=60)
+    assert len(server.requests) == 2
+
+    # Within the TTL (by URL prefix or given): served from disk
+    assert bot_utils.json_response(TEAMS_URL) == {'teams': []}
+    assert bot_utils.json_response(URL, ttl=60) == {'data': [1]}
+    assert len(server.requests) == 2
+
+    # Past it: revalidated
+    server.responses = [FakeResponse(304)]
+    assert bot_utils.json_response(URL, ttl=0) == {'data': [1]}
+    assert server.requests[-1] == {'If-None-Match': '"v1"'}
+
+
+def test_replay_never_fetches(server, use_cache):
+    use_cache('record')
+    server.responses = [FakeResponse(200, {'data': [1]})]
+    bot_utils.json_response(URL)
+
+    use_cache('replay')
+    assert bot_utils.json_response(URL, ttl=0) == {'data': [1]}
+    with pytest.raises(LookupError):
+        bot_utils.json_response('https://api.example.com/unrecorded')
+    assert len(server.requests) == 1
+
+
+def test_record_always_fetches(server, use_cache):
+    cache = use_cache('record')
+    server.responses = [FakeResponse(200, {'teams': [1]}), FakeResponse(200, {'teams': [2]})]
+
+    # Even a URL whose entry would be fresh in `on` mode
+    assert bot_utils.json_response(TEAMS_URL) == {'teams': [1]}
+    assert bot_utils.json_response(TEAMS_URL) == {'teams': [2]}
+    assert server.requests == [{}, {}]
+    assert json.loads(cache.load(TEAMS_URL)['body']) == {'teams': [2]}
@@ -0,0 +1,29 @@
+import bot
+import lambda_handler
+from bot.tools import Tools
+from synthetic import make_props, make_odds
+
+BOARD_SHEETS = ['88012551', '1121328359', '686271289', '2072968799', '1498038724', str(lambda_handler.LAST_UPDATE_SHEET)]
+
+
+def test_handler_publishes_every_sheet(hltv, make_tools, sheets, monkeypatch):
+    tools = make_tools()
+    boards = {'PP': make_props(hltv, 60, 'PP'), 'UD': make_props(hltv, 60, 'UD', seed=7), 'Bovado': make_odds(hltv)}
+
+    monkeypatch.setattr(lambda_handler, 'fetch_all_sources', lambda *sources: dict(boards))
+    # Set in the module dict, getattr would build the real (lazy) clients
+    for name, instance in {'pp': None, 'ud': None, 'bv': None, 'gs': sheets}.items():
+        monkeypatch.setitem(vars(bot), name, instance)
+    monkeypatch.setattr(Tools, 'preload', lambda self, *names: tools)
+
+    assert lambda_handler.handler()['statusCode'] == 200
+    written = sheets.written[-1]
+    assert set(BOARD_SHEETS) | {'PP Movements', 'UD Movements'} == set(written)
+    assert len(written['88012551']) == 60 and len(written['1121328359']) == 60
+    assert written[str(lambda_handler.LAST_UPDATE_SHEET)].loc[0, 'PP Props'] == 60
+
+    # Next run: props that came off the board show up on the 7-day sheets
+    boards['PP'] = make_props(hltv, 60, 'PP')[20:]
+    assert lambda_handler.handler()['statusCode'] == 200
+    previous = sheets.written[-1]['2072968799']
+    assert len(previous) > 0 and previous['URL'].notna().all()
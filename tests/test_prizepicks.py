@@ -0,0 +1,39 @@
+import bot.prizepicks as prizepicks
+from bot.prizepicks import PrizePicks
+
+
+def projections(line_id: str):
+    return {
+        'included': [{
+            'type': 'new_player', 'id': '7',
+            'attributes': {'display_name': 'gamer00001x', 'team': 'Squad 0001'},
+            'relationships': {'team_data': {'data': {'id': '70'}}},
+        }],
+        'data': [{
+            'id': line_id,
+            'attributes': {'description': 'Squad 0002 MAPS 1-2', 'start_time': '2026-10-18T18:00:00-04:00', 'line_score': 30.5, 'stat_type': 'MAPS 1-2 Kills'},
+            'relationships': {'new_player': {'data': {'id': '7'}}},
+        }],
+    }
+
+
+def test_failed_league_is_skipped(monkeypatch):
+    def json_response(url: str):
+        league_id = url.rsplit('=', 1)[-1]
+        if league_id == '265':
+            raise ConnectionError('league down')
+        return projections(f'line-{league_id}')
+
+    monkeypatch.setattr(prizepicks, 'json_response', json_response)
+    props = list(PrizePicks().current_props_many(['265', '274', '159']))
+
+    assert sorted(prop.league_id for prop in props) == ['159', '274']
+    assert sorted(prop.id for prop in props) == ['line-159', 'line-274']
+
+
+def test_shared_instances_dont_shadow_submodules():
+    import bot
+    import pkgutil
+
+    submodules = {module.name for module in pkgutil.iter_modules(bot.__path__)}
+    assert not submodules & set(bot._instances)
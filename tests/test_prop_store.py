@@ -0,0 +1,33 @@
+import os
+import errno
+from datetime import datetime, timedelta, timezone
+import pandas as pd
+import lambda_handler
+from bot import prop_store
+from bot.prop_store import PropStore
+from synthetic import make_props, make_odds
+
+
+def test_full_disk_skips_the_store(hltv, make_tools, sheets, monkeypatch):
+    def disk_full(*args, **kwargs):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    monkeypatch.setattr(prop_store.gzip, 'open', disk_full)
+    tools = make_tools()
+    updates = lambda_handler.sheet_updates(tools, sheets, make_props(hltv, 60, 'PP'), make_props(hltv, 60, 'UD', seed=7), make_odds(hltv))
+
+    assert updates and tools.prop_store.read('PP').empty
+
+
+def test_old_partitions_are_pruned(tmp_path):
+    store = PropStore(str(tmp_path))
+    today = datetime(2026, 10, 18, 12, tzinfo=timezone.utc)
+    frame = pd.DataFrame({'ID': [1], 'Line Score': [20.5]})
+
+    for days in (45, PropStore.RETENTION_DAYS + 1, PropStore.RETENTION_DAYS, 1):
+        store.append('PP', frame, today - timedelta(days=days))
+    store.append('PP', frame, today)
+
+    kept = sorted(os.listdir(str(tmp_path / 'PP')))
+    assert kept == [os.path.basename(store.partition('PP', (today - timedelta(days=days)).date())) for days in (PropStore.RETENTION_DAYS, 1, 0)]
+    assert len(store.read('PP', PropStore.RETENTION_DAYS, today)) == 3
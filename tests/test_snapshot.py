@@ -0,0 +1,118 @@
+import os
+import errno
+import numpy as np
+import pandas as pd
+import pytest
+from bot.snapshot import TableSnapshot
+from bot.utils.bot_utils import cache_dir, TMP_CACHE_DIR
+
+
+class FakeDatabase:
+    '''
+    Serves `rows` the way `Database.table` does, watermark filter included.
+    '''
+    def __init__(self, rows: pd.DataFrame):
+        self.rows = rows
+        self.queries = []
+
+    def table(self, table_name: str, columns: list = None, where: str = None, params: tuple = None, dtypes: dict = None):
+        self.queries.append(where)
+        if where is None:
+            return self.rows.copy()
+        return self.rows[self.rows['date'] >= pd.Timestamp(params[0])].reset_index(drop=True)
+
+
+def sorted_rows(df: pd.DataFrame):
+    return df.sort_values(by=['match_url', 'player_url', 'map_number']).reset_index(drop=True)
+
+
+def split(hltv: pd.DataFrame, days: int):
+    cutoff = hltv['date'].max() - pd.Timedelta(days=days)
+    return hltv[hltv['date'] <= cutoff].reset_index(drop=True)
+
+
+def test_sync_appends_new_rows(hltv, tmp_path):
+    db = FakeDatabase(split(hltv, 60))
+    snapshot = TableSnapshot(db, directory=str(tmp_path))
+    data, new_rows = snapshot.sync()
+    assert len(data) == len(new_rows) == len(db.rows)
+
+    db.rows = hltv
+    data, new_rows = snapshot.sync()
+    assert len(new_rows) == len(hltv) - len(split(hltv, 60))
+    assert len(snapshot.meta['segments']) == 2 and snapshot.version == 2
+
+    # A new process reads both segments back as the full table
+    loaded = TableSnapshot(db, directory=str(tmp_path)).load()
+    pd.testing.assert_frame_equal(sorted_rows(loaded), sorted_rows(hltv), check_dtype=False)
+    pd.testing.assert_frame_equal(sorted_rows(data), sorted_rows(hltv), check_dtype=False)
+
+    # Nothing new: no write, no version bump
+    _, new_rows = snapshot.sync()
+    assert new_rows.empty and snapshot.version == 2
+
+
+def test_strings_are_dictionary_encoded(hltv, tmp_path):
+    snapshot = TableSnapshot(FakeDatabase(hltv), directory=str(tmp_path))
+    snapshot.sync()
+
+    segment = os.path.join(str(tmp_path), snapshot.meta['segments'][0]['name'])
+    size = sum(os.path.getsize(os.path.join(segment, name)) for name in os.listdir(segment))
+    assert size / len(hltv) < 200 # bytes per row, the CSV of this frame is larger
+    assert np.load(os.path.join(segment, 'player_url.npy')).dtype == np.int32
+
+
+def test_segments_are_merged(hltv, tmp_path, monkeypatch):
+    monkeypatch.setattr(TableSnapshot, 'MAX_SEGMENTS', 3)
+    db = FakeDatabase(split(hltv, 200))
+    snapshot = TableSnapshot(db, directory=str(tmp_path))
+    snapshot.sync()
+
+    for days in (150, 100, 50, 0):
+        db.rows = split(hltv, days)
+        snapshot.sync()
+    assert len(snapshot.meta['segments']) <= 3
+    assert sorted(entry for entry in os.listdir(str(tmp_path)) if entry.startswith('segment-')) == \
+        sorted(segment['name'] for segment in snapshot.meta['segments'])
+    pd.testing.assert_frame_equal(sorted_rows(snapshot.load()), sorted_rows(hltv), check_dtype=False)
+
+
+def test_full_disk_falls_back_to_memory(hltv, tmp_path, monkeypatch):
+    db = FakeDatabase(split(hltv, 60))
+    snapshot = TableSnapshot(db, directory=str(tmp_path))
+    snapshot.sync()
+
+    def disk_full(*args, **kwargs):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+
+    monkeypatch.setattr(np, 'save', disk_full)
+    db.rows = hltv
+    data, new_rows = snapshot.sync()
+
+    assert not snapshot.saved and snapshot.version == 1
+    assert len(data) == len(hltv) and not new_rows.empty
+    assert len(TableSnapshot(db, directory=str(tmp_path)).load()) == len(split(hltv, 60))
+
+
+@pytest.mark.parametrize('saved', [True, False])
+def test_tools_history_follows_snapshot(hltv, tmp_path, make_tools, monkeypatch, saved):
+    from bot.history import HistoryIndex
+
+    snapshot = TableSnapshot(FakeDatabase(hltv), directory=str(tmp_path / 'hltv_cs'))
+    tools = make_tools(snapshot=snapshot)
+    del tools.cs_data
+    if not saved:
+        monkeypatch.setattr(TableSnapshot, '_write', lambda self, df, segments: setattr(self, 'saved', False) or False)
+
+    tools.history
+    assert os.path.exists(tools._history_path()) == saved
+    assert tools.data_version() == (snapshot.version if saved else id(tools.cs_data))
+    assert tools.history.index.keys() == HistoryIndex(hltv).index.keys()
+
+
+def test_unwritable_cache_dir_falls_back_to_tmp(tmp_path):
+    assert cache_dir(str(tmp_path / 'efs')) == str(tmp_path / 'efs')
+
+    # No mount: the path can't be created
+    (tmp_path / 'mnt').write_text('')
+    assert cache_dir(str(tmp_path / 'mnt' / 'efs')) == TMP_CACHE_DIR
@@ -0,0 +1,241 @@
+import numpy as np
+import pandas as pd
+from bot.aliases import AliasCache
+from bot.prop_store import PropStore
+from bot.props import Prop
+from synthetic import make_props, make_odds
+
+SORT_BY = ['Team', 'Opponent', 'Player']
+
+
+def reference_scores(tools, props: list, sportsbook: str):
+    # The per-prop loop `score_props` replaced
+    df_columns = ['Player', 'Team', 'Opponent', 'Type'] + [f'M{i}' for i in range(1, 16)] +\
+    [sportsbook, 'L10 Avg', 'L10 Diff', 'L15 Avg', 'L15 Diff', 'Chance', 'Edge +/-', 'O/U', 'Odd', 'URL']
+
+    def fix_type_column(title_element: str):
+        title_element = str(title_element).title()
+        title_element = title_element.replace('Maps ', 'M')
+        title_element = title_element.replace('Headshots', 'Hs')
+        title_element = title_element.replace('1-2-3', '1-3')
+        return title_element
+
+    rows = []
+    for prop in props:
+        row = {col: None for col in df_columns}
+        player_url, map_type, prop_line = prop.get('Player URL'), prop.get('Type'), float(prop.get('Line Score'))
+        row.update({
+            'Player': prop.get('Player Name'), 'URL': player_url, 'Team': prop.get('Player Team'),
+            'Opponent': prop.get('Opp'), 'Type': fix_type_column(map_type), sportsbook: prop_line,
+        })
+        rows.append(row)
+
+        if player_url is None:
+            continue
+
+        player_values, l15_values, l10_avg, l15_avg = tools.previous_game_stats(player_url, map_type)
+        if isinstance(l15_values, np.ndarray):
+            for k, v in enumerate(l15_values, start=1):
+                row[f'M{k}'] = v
+
+        probability, edge, p = tools.probability(player_values, prop_line)
+        row.update({
+            'Chance': probability, 'Edge +/-': 0 if probability == 0 else edge, 'O/U': p,
+            'L10 Avg': l10_avg, 'L10 Diff': l10_avg - prop_line if pd.notnull(l10_avg) else None,
+            'L15 Avg': l15_avg, 'L15 Diff': l15_avg - prop_line if pd.notnull(l15_avg) else None,
+            'Odd': prop.get('Odd'),
+        })
+    return pd.DataFrame(rows, columns=df_columns)
+
+
+def reference_map_data(cs_data: pd.DataFrame):
+    # The merge-based `_get_data`/`_agg_data` the pivot replaced
+    stats = ["kills", "headshots", "assists", "deaths", "kast", "adr", "rating"]
+
+    def agg_data(map_df, map_three):
+        avg_stats = {"kast", "adr", "rating", "k_d_diff", "fk_diff"}
+        num_maps = 3 if map_three else 2
+        for stat in stats:
+            idx = cs_data.columns.get_indexer([stat])[0]
+            total = sum(map_df[f"{stat}_map_{i}"] for i in range(1, num_maps + 1))
+            map_df.insert(loc=idx, column=stat, value=total / num_maps if stat in avg_stats else total)
+        map_df.drop(columns=[f"{stat}_map_{i}" for stat in stats for i in range(1, num_maps + 1)], inplace=True)
+        map_df["map_number"] = f"MAPS 1-{num_maps}"
+        return map_df
+
+    cs_data = cs_data.copy()
+    cs_data[["kast", "adr", "rating"]] = cs_data[["kast", "adr", "rating"]].astype(float)
+    cs_data["date"] = pd.to_datetime(cs_data["date"])
+    cs_data = cs_data[~cs_data["map"].isin({'Best of 3', 'Best of 2', 'All', 'Cache'})].dropna().reset_index(drop=True)
+    cs_data.drop(columns=["k_d_diff", "fk_diff", "event", "date", "map", "team", "opponent", "player_name", "team_score", "opponent_score"], inplace=True)
+    cs_data = cs_data.groupby("match_url").filter(lambda g: set(g["map_number"]).issubset({1, 2, 3})).reset_index(drop=True)
+
+    map_1 = cs_data[cs_data["map_number"] == 1]
+    map_2 = cs_data[cs_data["map_number"] == 2]
+    map_3 = cs_data[cs_data["map_number"] == 3]
+    target_cols = ["match_url", "player_url"] + stats
+    map_1_2 = pd.merge(map_1, map_2[target_cols], on=["match_url", "player_url"], suffixes=("_map_1", "_map_2"))
+    map_1_2_3 = map_1_2.merge(map_3[target_cols], on=["match_url", "player_url"]).rename(columns={stat: f"{stat}_map_3" for stat in stats})
+
+    map_1_2 = agg_data(map_1_2, map_three=False)
+    map_1_2_3 = agg_data(map_1_2_3, map_three=True)
+    map_1, map_3 = map_1.copy(), map_3.copy()
+    map_1["map_number"] = "MAPS 1"
+    map_3["map_number"] = "MAPS 3"
+    return pd.concat([map_1, map_3, map_1_2, map_1_2_3], ignore_index=True)
+
+
+def assert_boards_equal(board: pd.DataFrame, expected: pd.DataFrame):
+    assert list(board.columns) == list(expected.columns)
+    assert len(board) == len(expected)
+    for col in board.columns:
+        values, expected_values = board[col].to_numpy(dtype=object), expected[col].to_numpy(dtype=object)
+        numeric = pd.to_numeric(pd.Series(expected_values), errors='coerce')
+        if numeric.notna().any() and numeric.notna().sum() == pd.Series(expected_values).notna().sum():
+            np.testing.assert_allclose(pd.to_numeric(pd.Series(values)).to_numpy(dtype=float), numeric.to_numpy(dtype=float), err_msg=col)
+        else:
+            assert [None if pd.isna(v) else v for v in values] == [None if pd.isna(v) else v for v in expected_values], col
+
+
+def test_score_props_matches_per_prop_loop(hltv, make_tools):
+    tools = make_tools()
+    props = tools.map_all_data(make_props(hltv, 120, 'PP'), 'PP', make_odds(hltv))
+
+    scored = tools.score_props(Prop.frame(props), 'PP')
+    assert_boards_equal(scored, reference_scores(tools, props, 'PP'))
+
+
+def test_get_data_matches_merges(hltv, make_tools):
+    cs_data = hltv.copy()
+    # A match with a fourth map is dropped whole, and aggregate map rows are skipped
+    cs_data.loc[cs_data['match_url'] == cs_data['match_url'].iloc[0], 'map_number'] = 4
+    cs_data.loc[cs_data.index[-25:], 'map'] = 'All'
+
+    data = make_tools(cs_data=cs_data)._get_data()
+    pd.testing.assert_frame_equal(data, reference_map_data(cs_data))
+
+
+def test_name_lookups_match_frame_filters(hltv, make_tools):
+    # The per-prop filters `map_all_data` used to run on `cs_data`
+    cs_data = hltv.sample(frac=1, random_state=3).reset_index(drop=True)
+    lookups = make_tools(cs_data=cs_data).name_lookups
+
+    for team in cs_data['team'].unique():
+        df = cs_data[cs_data['team'] == team]
+        assert lookups['teams'][team] == df.tail().iloc[0]['team_url']
+        assert list(lookups['team_players'][team]) == list(df['player_name'].unique())
+
+        for player_name, urls in lookups['team_players'][team].items():
+            player_values = df[df['player_name'] == player_name].tail().iloc[0]
+            assert urls == (player_values['player_url'], player_values['team_url'])
+
+    for player_name, player_url in lookups['players'].items():
+        assert player_url == cs_data[cs_data['player_name'] == player_name].iloc[0]['player_url']
+
+
+def test_diff_props_statuses(make_tools):
+    previous = pd.DataFrame({
+        'ID': ['1', '2', '3', '4'],
+        'Line Score': [10.5, 20.5, 30.5, 40.5],
+        'Over Odd': [None, -110, None, None],
+        'Under Odd': [None, -110, None, None],
+    })
+    current = pd.DataFrame({
+        'ID': ['1', '2', '3', '5'],
+        'Line Score': [10.5, 20.5, 31.5, 50.5],
+        'Over Odd': [None, -120, None, None],
+        'Under Odd': [None, -110, None, None],
+    })
+
+    movements = make_tools().diff_props(current, previous).set_index('ID')
+    assert movements['Status'].to_dict() == {'1': 'unchanged', '2': 'moved', '3': 'moved', '5': 'new', '4': 'removed'}
+    assert movements.loc['3', 'Line Move'] == 1.0
+    assert bool(movements.loc['2', 'Odds Moved']) and not bool(movements.loc['3', 'Odds Moved'])
+
+
+def moved_board(hltv, count: int = 80):
+    # The next fetch: a few lines moved, one prop pulled and one added
+    props = make_props(hltv, count + 1, 'PP')
+    for prop in props[:count:7]:
+        prop.line_score += 1
+    return props[1:]
+
+
+def test_reused_board_matches_full_rescore(hltv, make_tools, tmp_path):
+    odds = make_odds(hltv)
+    tools = make_tools()
+    tools.pretty_dataframes(make_props(hltv, 80, 'PP'), 'PP', odds, SORT_BY)
+    tools.save_props('PP')
+
+    full = make_tools(aliases=AliasCache(str(tmp_path / 'cold.json')), prop_store=PropStore(str(tmp_path / 'cold')))
+    expected = full.pretty_dataframes(moved_board(hltv), 'PP', odds, SORT_BY).reset_index(drop=True)
+
+    # Warm: scored rows and urls kept from the last board
+    warm = tools.pretty_dataframes(moved_board(hltv), 'PP', odds, SORT_BY).reset_index(drop=True)
+    assert_boards_equal(warm, expected)
+    assert (tools.movements['PP']['Status'] == 'unchanged').any()
+
+    # New process: urls come back from the prop store, everything is scored again
+    stored = make_tools().pretty_dataframes(moved_board(hltv), 'PP', odds, SORT_BY).reset_index(drop=True)
+    assert_boards_equal(stored, expected)
+
+
+def test_alias_cache_counts_one_lookup_per_prop(hltv, make_tools):
+    odds = make_odds(hltv)
+    make_tools().map_all_data(make_props(hltv, 60, 'PP'), 'PP', odds)
+
+    # Second run: every named prop is looked up once, whatever passes it goes through
+    tools = make_tools()
+    props = make_props(hltv, 60, 'PP')
+    tools.map_all_data(props, 'PP', odds)
+    assert tools.aliases.hits + tools.aliases.misses == len(props)
+    assert tools.aliases.hits > 0
+
+
+class UnnamedModel:
+    # Fitted on arrays, so it only knows how many features it takes
+    n_features_in_ = 5
+
+    def predict(self, features):
+        if features.shape[1] != self.n_features_in_:
+            raise ValueError(f'X has {features.shape[1]} features, expected {self.n_features_in_}')
+        return np.full(len(features), 'O')
+
+
+class BrokenModel:
+    def predict(self, features):
+        raise ValueError('model is broken')
+
+
+def test_predict_props_skips_unusable_models(hltv, make_tools):
+    from synthetic import LineModel
+
+    props = make_tools().map_all_data(make_props(hltv, 40, 'PP'), 'PP', None)
+    frame = Prop.frame(props)
+
+    for model in (UnnamedModel(), BrokenModel()):
+        predictions = make_tools(model=model).predict_props(frame)
+        assert len(predictions) == len(frame) and predictions['Model'].isna().all()
+
+    predictions = make_tools(model=LineModel()).predict_props(frame)
+    assert predictions['Model'].isin(['O', 'U']).any()
+
+
+def test_match_rate_covers_reused_props(hltv, make_tools):
+    from bot.utils.metrics import metrics
+
+    odds = make_odds(hltv)
+    tools = make_tools()
+    metrics.reset()
+    tools.pretty_dataframes(make_props(hltv, 80, 'PP'), 'PP', odds, SORT_BY)
+    first = dict(metrics.counters)
+
+    # Unchanged board: almost everything is reused, the rate still describes all of it
+    metrics.reset()
+    tools.pretty_dataframes(make_props(hltv, 80, 'PP'), 'PP', odds, SORT_BY)
+    second = dict(metrics.counters)
+
+    assert second['PP.reused'] > 0 and first['PP.reused'] == 0
+    for counter in ('PP.props', 'PP.matched', 'PP.risky', 'PP.match_rate'):
+        assert second[counter] == first[counter], counter
+    assert first['PP.match_rate'] > 0.9